@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Compares the per-call overhead of the old ctypes setup (restype set to
+# validate_result, no argtypes, an if/elif chain per return code) with the
+# declarative bindings from turboactivate.c_wrapper.TA_FUNCTIONS.
+#
+# libc's abs() stands in for a TA_* function: it returns its argument, so
+# it can "return" any TurboActivate return code without the real library.
+#
+#   python benchmarks/bench_binding.py
+
+import ctypes
+import ctypes.util
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from turboactivate.c_wrapper import (
+    _errcheck,
+    TurboActivateError,
+    TA_OK,
+    TA_E_INET_TLS,
+)
+
+NUMBER = 200000
+
+
+def legacy_validate_result(return_code):
+    # the if/elif chain validate_result used to walk, abridged to the same
+    # number of comparisons before reaching TA_E_INET_TLS (the last branch)
+    if return_code == TA_OK:
+        return
+
+    for code in range(1, 29):
+        if return_code == code:
+            raise TurboActivateError(return_code)
+
+    if return_code == TA_E_INET_TLS:
+        raise TurboActivateError(return_code)
+
+    raise TurboActivateError(return_code)
+
+
+def load_abs():
+    path = ctypes.util.find_library("c") or None
+    return getattr(ctypes.CDLL(path), "abs")
+
+
+def legacy_function():
+    func = load_abs()
+    func.restype = legacy_validate_result
+    return func
+
+
+def bound_function(argtypes=True):
+    func = load_abs()
+    func.restype = ctypes.c_int
+    func.errcheck = _errcheck
+
+    if argtypes:
+        func.argtypes = [ctypes.c_int]
+
+    return func
+
+
+def time_call(func, code):
+    def call():
+        try:
+            func(code)
+        except TurboActivateError:
+            pass
+
+    return timeit.timeit(call, number=NUMBER) / NUMBER * 1e9
+
+
+def main():
+    setups = (
+        ("before", legacy_function()),
+        ("after", bound_function()),
+        ("after, no argtypes", bound_function(argtypes=False)),
+    )
+
+    print("%-20s %16s %16s" % ("ns per call", "TA_OK", "TA_E_INET_TLS"))
+
+    for name, func in setups:
+        print("%-20s %16.0f %16.0f" % (name, time_call(func, TA_OK), time_call(func, TA_E_INET_TLS)))
+
+
+if __name__ == "__main__":
+    main()
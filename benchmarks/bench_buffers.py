@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Measures the time and the number of memory allocations of get_pkey(),
+# get_extra_data() and a (not cached) feature lookup against the stub
+# library, with a new output buffer for every call (and a size probe for
+# features) as before, and with the per-thread reusable buffers.
+#
+#   python benchmarks/bench_buffers.py
+
+import linecache
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import turboactivate
+from benchmarks import stub
+from turboactivate import TurboActivate
+from turboactivate.c_wrapper import cached_wstr, wbuf
+
+NUMBER = 100000
+
+
+# The per-call buffer versions
+def fresh_get_pkey(ta):
+    buf = new_buffer(35)
+    ta._lib.TA_GetPKey(ta._handle, buf, 35)
+
+    return buf.value
+
+
+def fresh_get_extra_data(ta):
+    buf = new_buffer(255)
+    ta._lib.TA_GetExtraData(ta._handle, buf, 255)
+
+    return buf.value
+
+
+def fresh_get_feature_value(ta, name):
+    name = cached_wstr(name)
+    buf_size = ta._lib.TA_GetFeatureValue(ta._handle, name, None, 0)
+    buf = new_buffer(buf_size)
+
+    ta._lib.TA_GetFeatureValue(ta._handle, name, buf, buf_size)
+
+    return buf.value
+
+
+new_buffer = wbuf
+
+
+def allocations_per_call(func):
+    global new_buffer
+
+    # Keep every buffer and result alive so their allocations show up in
+    # the snapshot. The per-thread buffer is the same object every time.
+    kept = []
+    thread_buffer = turboactivate.thread_buffer
+
+    def keep(make):
+        def wrapper(size=turboactivate.THREAD_BUFFER_SIZE):
+            buf = make(size)
+            kept.append(buf)
+            return buf
+
+        return wrapper
+
+    new_buffer = keep(wbuf)
+    turboactivate.thread_buffer = keep(thread_buffer)
+
+    try:
+        func()
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+
+        for _ in range(NUMBER):
+            kept.append(func())
+
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+    finally:
+        new_buffer = wbuf
+        turboactivate.thread_buffer = thread_buffer
+
+    # ignore the growth of the "kept" list itself
+    count = 0
+
+    for stat in after.compare_to(before, "lineno"):
+        frame = stat.traceback[0]
+
+        if "kept.append" not in linecache.getline(frame.filename, frame.lineno):
+            count += stat.count_diff
+
+    return float(count) / NUMBER
+
+
+def ns_per_call(func):
+    return timeit.timeit(func, number=NUMBER) / NUMBER * 1e9
+
+
+def main():
+    library_folder = stub.build()
+    ta = TurboActivate(stub.GUID, dat_file_loc=os.path.join(library_folder, "TurboActivate.dat"),
+                       library_folder=library_folder)
+
+    cases = (
+        ("get_pkey", lambda: fresh_get_pkey(ta), ta.get_pkey),
+        ("get_extra_data", lambda: fresh_get_extra_data(ta), ta.get_extra_data),
+        ("feature value", lambda: fresh_get_feature_value(ta, "seats"),
+         lambda: ta._get_feature_value("seats")),
+        ("long feature", lambda: fresh_get_feature_value(ta, "long"),
+         lambda: ta._get_feature_value("long")),
+    )
+
+    print("%-16s %22s %22s" % ("", "per-call buffer", "thread buffer"))
+    print("%-16s %10s %11s %10s %11s" % ("", "ns/call", "allocs/call", "ns/call", "allocs/call"))
+
+    for name, fresh, pooled in cases:
+        print("%-16s %10.0f %11.2f %10.0f %11.2f" % (name,
+                                                     ns_per_call(fresh), allocations_per_call(fresh),
+                                                     ns_per_call(pooled), allocations_per_call(pooled)))
+
+
+if __name__ == "__main__":
+    main()
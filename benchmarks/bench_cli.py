@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Measures the wall-clock time of a "python -m turboactivate status" health
+# probe against the stub library, from starting the interpreter to the JSON
+# output. With --budget the script exits with 1 when the median run is over
+# budget, so it can run in CI:
+#
+#   python benchmarks/bench_cli.py --budget 150
+
+import argparse
+import compileall
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks import stub
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the startup time of the status CLI")
+    parser.add_argument("--library-folder",
+                        help="folder with libTurboActivate and TurboActivate.dat (default: build the stub)")
+    parser.add_argument("--command", default="status", help="CLI command to run (default: status)")
+    parser.add_argument("--runs", type=int, default=10, help="runs (default: 10)")
+    parser.add_argument("--budget", type=float, help="fail if the median run takes longer than this many ms")
+
+    args = parser.parse_args()
+
+    library_folder = args.library_folder or stub.build()
+    command = [sys.executable, "-m", "turboactivate", args.command,
+               "--guid", stub.GUID, "--library-folder", library_folder]
+    env = dict(os.environ, PYTHONPATH=ROOT)
+
+    # don't measure the byte-code compiler
+    compileall.compile_dir(os.path.join(ROOT, "turboactivate"), quiet=1)
+
+    times = []
+
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        subprocess.check_call(command, env=env, stdout=subprocess.DEVNULL)
+        times.append((time.perf_counter() - start) * 1000)
+
+    times.sort()
+    median = times[len(times) // 2]
+
+    print("%s: median %.1f ms, min %.1f ms, max %.1f ms" % (" ".join(command[1:4]), median, times[0], times[-1]))
+
+    if args.budget is not None and median > args.budget:
+        print("over budget (%.1f ms)" % args.budget)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Reads feature values from 1 to 64 threads at once (against the stub
+# library) and reports the total throughput, both straight through the
+# lock-free read path and wrapped in a global lock the way callers had to
+# before TurboActivate had a concurrency model. A license change runs every
+# 10 ms on another thread, so readers keep racing with state swaps.
+#
+#   python benchmarks/bench_contention.py
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks import stub
+from turboactivate import TurboActivate
+
+THREADS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def throughput(read, threads, total):
+    """Reads "total" times, split over "threads" threads, and returns the reads per second."""
+    per_thread = total // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def reader():
+        barrier.wait()
+
+        for _ in range(per_thread):
+            read()
+
+    workers = [threading.Thread(target=reader) for _ in range(threads)]
+
+    for worker in workers:
+        worker.start()
+
+    # start the clock once every thread is up and ready
+    barrier.wait()
+    start = time.perf_counter()
+
+    for worker in workers:
+        worker.join()
+
+    return per_thread * threads / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Feature reads under thread contention")
+    parser.add_argument("--library-folder",
+                        help="folder with libTurboActivate and TurboActivate.dat (default: build the stub)")
+    parser.add_argument("--reads", type=int, default=200000, help="reads per measurement (default: 200000)")
+
+    args = parser.parse_args()
+
+    library_folder = args.library_folder or stub.build()
+    ta = TurboActivate(stub.GUID, dat_file_loc=os.path.join(library_folder, "TurboActivate.dat"),
+                       library_folder=library_folder)
+
+    global_lock = threading.Lock()
+
+    def lock_free():
+        return ta.get_feature_value("seats")
+
+    def locked():
+        with global_lock:
+            return ta.get_feature_value("seats")
+
+    stop = threading.Event()
+
+    def changer():
+        while not stop.wait(0.01):
+            ta.activate()
+
+    change_thread = threading.Thread(target=changer)
+    change_thread.start()
+
+    try:
+        print("%8s %20s %20s" % ("threads", "lock-free (reads/s)", "global lock (reads/s)"))
+
+        for threads in THREADS:
+            print("%8d %20.0f %20.0f" % (threads,
+                                         throughput(lock_free, threads, args.reads),
+                                         throughput(locked, threads, args.reads)))
+    finally:
+        stop.set()
+        change_thread.join()
+
+
+if __name__ == "__main__":
+    main()
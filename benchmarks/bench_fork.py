@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Worker boot cost: the time and the native initialization calls a worker
+# process needs before its first is_activated() and feature lookup, when it's
+# forked from a master that called ta.warm_up(), and when it's spawned with
+# a pickled TurboActivate object (stub library).
+#
+#   python benchmarks/bench_fork.py
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks import stub
+from turboactivate import TurboActivate, hooks
+
+# the calls that load things (as opposed to answering questions)
+INIT_FUNCTIONS = ("TA_PDetsFromPath", "TA_GetHandle", "TA_GetFeatureValue")
+
+
+class _Counter(object):
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, name, args, start, duration, return_code):
+        if name in INIT_FUNCTIONS:
+            self.calls += 1
+
+
+def _boot(ta, results):
+    counter = _Counter()
+    hooks.add_observer(counter)
+
+    start = time.perf_counter()
+
+    if ta is None:
+        # a forked worker building its own object, like an app module would
+        ta = TurboActivate(stub.GUID, dat_file_loc=_paths[0], library_folder=_paths[1])
+
+    ta.is_activated()
+    ta.get_feature_value("long")
+
+    results.put((time.perf_counter() - start, counter.calls))
+
+
+_paths = None
+
+
+def run(context, ta, workers):
+    results = context.Queue()
+    times, calls = [], 0
+
+    for _ in range(workers):
+        process = context.Process(target=_boot, args=(ta, results))
+        process.start()
+
+        elapsed, init_calls = results.get()
+        process.join()
+
+        times.append(elapsed)
+        calls += init_calls
+
+    times.sort()
+
+    return times[len(times) // 2], calls / float(workers)
+
+
+def main():
+    global _paths
+
+    parser = argparse.ArgumentParser(description="Worker boot cost after fork and spawn")
+    parser.add_argument("--workers", type=int, default=20, help="workers per mode (default: 20)")
+
+    args = parser.parse_args()
+
+    library_folder = stub.build()
+    dat_file_loc = os.path.join(library_folder, "TurboActivate.dat")
+    _paths = (dat_file_loc, library_folder)
+
+    ta = TurboActivate(stub.GUID, dat_file_loc=dat_file_loc, library_folder=library_folder,
+                       lazy=True)
+
+    print("%-22s %16s %18s" % ("mode", "boot (us, p50)", "native init calls"))
+
+    spawn = multiprocessing.get_context("spawn")
+    elapsed, calls = run(spawn, ta, args.workers)
+    print("%-22s %16.1f %18.1f" % ("spawn, pickled", elapsed * 1e6, calls))
+
+    fork = multiprocessing.get_context("fork")
+    elapsed, calls = run(fork, None, args.workers)
+    print("%-22s %16.1f %18.1f" % ("fork, cold master", elapsed * 1e6, calls))
+
+    ta.warm_up(features=["long"])
+
+    elapsed, calls = run(fork, None, args.workers)
+    print("%-22s %16.1f %18.1f" % ("fork, warmed master", elapsed * 1e6, calls))
+
+
+if __name__ == "__main__":
+    main()
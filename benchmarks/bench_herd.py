@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# The "thundering herd" of genuine checks: 1 to 64 threads call
+# ta.is_genuine_ex() at the same moment against the stub library, whose
+# network calls take --latency-ms. Reports how many native calls were made
+# and how many callers were coalesced onto another thread's call.
+#
+#   python benchmarks/bench_herd.py
+
+import argparse
+import ctypes
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks import stub
+from turboactivate import TurboActivate
+
+THREADS = (1, 2, 4, 8, 16, 32, 64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent genuine checks against a slow server")
+    parser.add_argument("--latency-ms", type=float, default=50, help="stub network latency (default: 50)")
+
+    args = parser.parse_args()
+
+    # read by the stub on its first network call
+    os.environ["TA_STUB_LATENCY_US"] = str(int(args.latency_ms * 1000))
+
+    library_folder = stub.build()
+    ta = TurboActivate(stub.GUID, dat_file_loc=os.path.join(library_folder, "TurboActivate.dat"),
+                       library_folder=library_folder)
+
+    network_calls = ta._lib.stub_network_calls
+    network_calls.restype = ctypes.c_long
+
+    print("%8s %14s %10s %12s" % ("threads", "native calls", "coalesced", "wall (ms)"))
+
+    for threads in THREADS:
+        barrier = threading.Barrier(threads)
+
+        def check():
+            barrier.wait()
+            ta.is_genuine_ex(90, 14)
+
+        workers = [threading.Thread(target=check) for _ in range(threads)]
+
+        ta._shared.flights.reset_stats()
+        before = network_calls()
+        start = time.perf_counter()
+
+        for worker in workers:
+            worker.start()
+
+        for worker in workers:
+            worker.join()
+
+        elapsed = time.perf_counter() - start
+        stats = ta.coalescing_stats()["is_genuine_ex"]
+
+        print("%8d %14d %10d %12.1f" % (threads, network_calls() - before, stats["coalesced"], elapsed * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Measures how long "import turboactivate" takes, using python -X importtime
+# in fresh interpreters. With --budget the script exits with 1 when the
+# median import time is over budget, so it can run in CI:
+#
+#   python benchmarks/bench_import.py --budget 20000
+#
+# -X importtime needs Python 3.7+.
+
+import argparse
+import compileall
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def import_time(module):
+    """The cumulative import time of module in a fresh interpreter, in microseconds."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.check_output([sys.executable, "-X", "importtime", "-c", "import " + module],
+                                     stderr=subprocess.STDOUT, env=env, cwd=ROOT)
+
+    for line in output.decode("utf-8").splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = [part.strip() for part in line.split("|")]
+
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+
+    raise RuntimeError("no import time reported for " + module)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the time it takes to import turboactivate")
+    parser.add_argument("--module", default="turboactivate", help="module to import (default: turboactivate)")
+    parser.add_argument("--runs", type=int, default=10, help="interpreters to start (default: 10)")
+    parser.add_argument("--budget", type=int, help="fail if the median import time is over this many us")
+
+    args = parser.parse_args()
+
+    # don't measure the byte-code compiler
+    compileall.compile_dir(os.path.join(ROOT, "turboactivate"), quiet=1)
+
+    times = sorted(import_time(args.module) for _ in range(args.runs))
+    median = times[len(times) // 2]
+
+    print("import %s: median %d us, min %d us, max %d us" % (args.module, median, times[0], times[-1]))
+
+    if args.budget is not None and median > args.budget:
+        print("over budget (%d us)" % args.budget)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
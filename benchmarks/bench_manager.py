@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Startup license checks for N products (one version GUID each) against the
+# stub library, whose network calls take --latency-ms: a serial loop over
+# TurboActivate objects versus LicenseManager.status_all().
+#
+#   python benchmarks/bench_manager.py --products 12
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks import stub
+from turboactivate import TurboActivate
+from turboactivate.manager import LicenseManager
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serial versus batch license checks of many products")
+    parser.add_argument("--products", type=int, default=12, help="number of products (default: 12)")
+    parser.add_argument("--latency-ms", type=float, default=50, help="stub network latency (default: 50)")
+    parser.add_argument("--workers", type=int, default=8, help="LicenseManager threads (default: 8)")
+
+    args = parser.parse_args()
+
+    # read by the stub on its first network call
+    os.environ["TA_STUB_LATENCY_US"] = str(int(args.latency_ms * 1000))
+
+    library_folder = stub.build()
+    dat_file = os.path.join(library_folder, "TurboActivate.dat")
+
+    # GUIDs of the same length as the real ones
+    guids = ["%023d.%08d" % (0, number) for number in range(1, args.products + 1)]
+
+    start = time.perf_counter()
+
+    for guid in guids:
+        ta = TurboActivate(guid, dat_file_loc=dat_file, library_folder=library_folder)
+        ta.is_genuine_ex(90, 14)
+        ta.is_activated()
+
+    serial = time.perf_counter() - start
+
+    with LicenseManager(guids, dat_file_loc=dat_file, library_folder=library_folder,
+                        max_workers=args.workers) as manager:
+        start = time.perf_counter()
+        batch = manager.status_all(90, 14)
+        parallel = time.perf_counter() - start
+
+    assert batch.complete, batch
+
+    print("%d products, %.0f ms per check" % (args.products, args.latency_ms))
+    print("serial loop:  %8.1f ms" % (serial * 1000))
+    print("status_all(): %8.1f ms (%d workers)" % (parallel * 1000, args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Measures the time and the number of memory allocations needed to turn a
+# feature name into a native string argument, with wstr() (a new object on
+# every call) and with cached_wstr() (shared, pre-encoded objects).
+#
+#   python benchmarks/bench_wstr.py
+
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from turboactivate.c_wrapper import cached_wstr, wstr
+
+NUMBER = 100000
+NAMES = ["feature_%d" % i for i in range(16)]
+
+
+def allocations_per_call(func):
+    # keep every result alive so the allocations show up in the snapshot
+    results = [None] * NUMBER
+    func(NAMES[0])
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+
+    for i in range(NUMBER):
+        results[i] = func(NAMES[i % len(NAMES)])
+
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    count = sum(stat.count_diff for stat in after.compare_to(before, "filename"))
+
+    return float(count) / NUMBER
+
+
+def ns_per_call(func):
+    names = NAMES
+    n = len(names)
+    counter = iter(range(NUMBER))
+
+    def call():
+        func(names[next(counter) % n])
+
+    return timeit.timeit(call, number=NUMBER) / NUMBER * 1e9
+
+
+def main():
+    print("%-14s %16s %16s" % ("", "ns per call", "allocs per call"))
+
+    for name, func in (("wstr", wstr), ("cached_wstr", cached_wstr)):
+        print("%-14s %16.0f %16.2f" % (name, ns_per_call(func), allocations_per_call(func)))
+
+
+if __name__ == "__main__":
+    main()
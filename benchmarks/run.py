@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Times every public TurboActivate method against the stub library in
+# benchmarks/stub, so only the overhead of the Python wrapper is measured.
+#
+# Run the benchmarks and save the results (nanoseconds per call):
+#
+#   python benchmarks/run.py -o before.json
+#
+# Fail if any method is slower than its per-call budget ({"name": ns}):
+#
+#   python benchmarks/run.py --budget budget.json
+#
+# Compare two runs, exiting with 1 if anything got more than 10% slower:
+#
+#   python benchmarks/run.py --compare before.json after.json --threshold 10
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from benchmarks import stub
+from turboactivate import TurboActivate
+
+FEATURES = ["feature_%d" % i for i in range(10)]
+
+
+def benchmarks(library_folder):
+    dat_file_loc = os.path.join(library_folder, "TurboActivate.dat")
+
+    def make():
+        return TurboActivate(stub.GUID, dat_file_loc=dat_file_loc, library_folder=library_folder)
+
+    ta = make()
+
+    def uncached_feature_value():
+        ta.clear_cache()
+        ta.get_feature_value("seats")
+
+    return [
+        ("__init__", make),
+        ("activate", ta.activate),
+        ("activate_from_file", lambda: ta.activate_from_file("activation-response.xml")),
+        ("activation_request_to_file", lambda: ta.activation_request_to_file("activation-request.xml")),
+        ("check_and_save_pkey", lambda: ta.check_and_save_pkey("AAAA-BBBB-CCCC-DDDD-EEEE-FFFF-GGGG")),
+        ("deactivate", ta.deactivate),
+        ("deactivation_request_to_file", lambda: ta.deactivation_request_to_file("deactivation-request.xml")),
+        ("extend_trial", lambda: ta.extend_trial("extension")),
+        ("get_extra_data", ta.get_extra_data),
+        ("get_feature_value", lambda: ta.get_feature_value("seats")),
+        ("get_feature_value (uncached)", uncached_feature_value),
+        ("get_feature_values (10)", lambda: ta.get_feature_values(FEATURES)),
+        ("get_pkey", ta.get_pkey),
+        ("get_version", ta.get_version),
+        ("has_feature", lambda: ta.has_feature("seats")),
+        ("is_activated", ta.is_activated),
+        ("is_date_valid", lambda: ta.is_date_valid("2099-12-31 00:00:00")),
+        ("is_genuine", ta.is_genuine),
+        ("is_genuine_ex", lambda: ta.is_genuine_ex(90, 14, True)),
+        ("is_product_key_valid", ta.is_product_key_valid),
+        ("set_custom_act_data_path", lambda: ta.set_custom_act_data_path(library_folder)),
+        ("set_custom_proxy", lambda: ta.set_custom_proxy("http://127.0.0.1:8080/")),
+        ("trial_days_remaining", ta.trial_days_remaining),
+        ("use_trial", ta.use_trial),
+    ]
+
+
+def time_per_call(func, repeat):
+    """The best of "repeat" runs, in nanoseconds per call."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e9
+
+
+def run(args):
+    library_folder = args.library_folder or stub.build()
+    results = {}
+
+    for name, func in benchmarks(library_folder):
+        results[name] = time_per_call(func, args.repeat)
+        print("%-32s %10.0f ns" % (name, results[name]))
+
+    report = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.budget:
+        with open(args.budget) as f:
+            budget = json.load(f)
+
+        over = sorted(name for name, ns in budget.items() if results.get(name, 0) > ns)
+
+        for name in over:
+            print("over budget: %s (%.0f ns > %.0f ns)" % (name, results[name], budget[name]))
+
+        return 1 if over else 0
+
+    return 0
+
+
+def compare(args):
+    with open(args.compare[0]) as f:
+        before = json.load(f)["results"]
+
+    with open(args.compare[1]) as f:
+        after = json.load(f)["results"]
+
+    regressions = 0
+
+    print("%-32s %12s %12s %8s" % ("", "before (ns)", "after (ns)", "change"))
+
+    for name in sorted(set(before) & set(after)):
+        change = (after[name] - before[name]) / before[name] * 100
+        flag = ""
+
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+
+        print("%-32s %12.0f %12.0f %+7.1f%%%s" % (name, before[name], after[name], change, flag))
+
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TurboActivate wrapper benchmarks")
+    parser.add_argument("-o", "--output", help="write the results to this JSON file")
+    parser.add_argument("--library-folder",
+                        help="folder with libTurboActivate and TurboActivate.dat (default: build the stub)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark (default: 5)")
+    parser.add_argument("--budget", help="JSON file of per-call budgets in ns, keyed by benchmark name")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"),
+                        help="compare two result files instead of running the benchmarks")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent slowdown reported as a regression (default: 10)")
+
+    args = parser.parse_args()
+
+    return compare(args) if args.compare else run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+#
+# Builds the stub libTurboActivate used by the benchmarks.
+
+import os
+import subprocess
+import tempfile
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_turboactivate.c")
+
+# Any GUID works with the stub library.
+GUID = "00000000000000000000000.00000000"
+
+
+def build(directory=None):
+    """
+    Compiles the stub into directory (a new temporary directory by default)
+    next to an empty TurboActivate.dat, and returns the directory. Set the
+    CC environment variable to use another C compiler.
+    """
+    if directory is None:
+        directory = tempfile.mkdtemp(prefix="turboactivate-stub-")
+
+    library = os.path.join(directory, "libTurboActivate.so")
+
+    if not os.path.exists(library) or os.path.getmtime(library) < os.path.getmtime(SOURCE):
+        cc = os.environ.get("CC", "cc")
+        subprocess.check_call([cc, "-shared", "-fPIC", "-O2", "-o", library, SOURCE])
+
+    open(os.path.join(directory, "TurboActivate.dat"), "a").close()
+
+    return directory
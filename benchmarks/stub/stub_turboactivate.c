@@ -0,0 +1,148 @@
+/*
+ * A stand-in for libTurboActivate used by the benchmarks. Every TA_*
+ * export does (almost) nothing, and answers as if the product was
+ * activated and genuine, so the benchmarks measure only the overhead of
+ * the Python wrapper. No network, no license, no TurboActivate.dat needed.
+ *
+ * The calls that go to the LimeLM servers in the real library (activating
+ * and the genuine checks) sleep for $TA_STUB_LATENCY_US microseconds (0 by
+ * default), and stub_network_calls() returns how many of them were made.
+ *
+ * Strings are char* (the benchmarks are for the non-Windows builds).
+ */
+
+#include <stdint.h>
+#include <stddef.h>
+#include <stdlib.h>
+#include <stdio.h>
+#include <string.h>
+#include <time.h>
+#include <unistd.h>
+
+#define TA_OK 0
+#define TA_FAIL 1
+#define TA_E_EXPIRED 0x0D
+#define TA_E_INSUFFICIENT_BUFFER 0x0E
+
+typedef void (*TrialCallbackType)(uint32_t, void *);
+
+static int copy_out(const char *value, char *buf, int size)
+{
+    int needed = (int)strlen(value) + 1;
+
+    if (buf == NULL || size == 0)
+        return needed;
+
+    if (size < needed)
+        return TA_E_INSUFFICIENT_BUFFER;
+
+    memcpy(buf, value, needed);
+    return TA_OK;
+}
+
+static long network_calls;
+
+static int network(void)
+{
+    static long latency = -1;
+
+    if (latency < 0)
+    {
+        const char *value = getenv("TA_STUB_LATENCY_US");
+        latency = value ? atol(value) : 0;
+    }
+
+    __sync_fetch_and_add(&network_calls, 1);
+
+    if (latency > 0)
+        usleep((useconds_t)latency);
+
+    return TA_OK;
+}
+
+long stub_network_calls(void) { return network_calls; }
+
+int TA_PDetsFromPath(const char *path) { return TA_OK; }
+int TA_PDetsFromByteArray(const uint8_t *arr, size_t len) { return TA_OK; }
+uint32_t TA_GetHandle(const char *guid) { return 1; }
+
+int TA_Activate(uint32_t h, void *options) { return network(); }
+int TA_ActivateFromFile(uint32_t h, const char *filename) { return TA_OK; }
+int TA_ActivationRequestToFile(uint32_t h, const char *filename, void *options) { return TA_OK; }
+int TA_CheckAndSavePKey(uint32_t h, const char *pkey, uint32_t flags) { return TA_OK; }
+int TA_Deactivate(uint32_t h, char erase) { return TA_OK; }
+int TA_DeactivationRequestToFile(uint32_t h, const char *filename, char erase) { return TA_OK; }
+int TA_IsActivated(uint32_t h) { return TA_OK; }
+int TA_IsProductKeyValid(uint32_t h) { return TA_OK; }
+int TA_IsGenuine(uint32_t h) { return network(); }
+int TA_IsGenuineEx(uint32_t h, void *options) { return network(); }
+/* dates ("YYYY-MM-DD HH:MM:SS" UTC) in the past have expired */
+int TA_IsDateValid(uint32_t h, const char *date, uint32_t flags)
+{
+    struct tm tm;
+
+    memset(&tm, 0, sizeof(tm));
+
+    if (sscanf(date, "%d-%d-%d %d:%d:%d", &tm.tm_year, &tm.tm_mon, &tm.tm_mday,
+               &tm.tm_hour, &tm.tm_min, &tm.tm_sec) < 3)
+        return TA_FAIL;
+
+    tm.tm_year -= 1900;
+    tm.tm_mon -= 1;
+
+    return timegm(&tm) <= time(NULL) ? TA_E_EXPIRED : TA_OK;
+}
+
+int TA_GenuineDays(uint32_t h, uint32_t days, uint32_t grace, uint32_t *remaining, char *in_grace)
+{
+    *remaining = 90;
+    *in_grace = 0;
+    return TA_OK;
+}
+
+int TA_GetPKey(uint32_t h, char *buf, int size) { return copy_out("AAAA-BBBB-CCCC-DDDD-EEEE-FFFF-GGGG", buf, size); }
+int TA_GetExtraData(uint32_t h, char *buf, int size) { return copy_out("extra data", buf, size); }
+
+int TA_GetFeatureValue(uint32_t h, const char *name, char *buf, int size)
+{
+    static char long_value[1001];
+
+    /* a feature named "missing" doesn't exist */
+    if (strcmp(name, "missing") == 0)
+        return buf == NULL ? 0 : TA_FAIL;
+
+    /* and "long" has a 1000 character value */
+    if (strcmp(name, "long") == 0)
+    {
+        if (long_value[0] == 0)
+            memset(long_value, 'x', sizeof(long_value) - 1);
+
+        return copy_out(long_value, buf, size);
+    }
+
+    return copy_out("1024", buf, size);
+}
+
+int TA_UseTrial(uint32_t h, uint32_t flags, const char *extra) { return TA_OK; }
+int TA_UseTrialVerifiedRequest(uint32_t h, const char *filename, const char *extra) { return TA_OK; }
+int TA_UseTrialVerifiedFromFile(uint32_t h, const char *filename, uint32_t flags) { return TA_OK; }
+int TA_ExtendTrial(uint32_t h, uint32_t flags, const char *code) { return TA_OK; }
+
+int TA_TrialDaysRemaining(uint32_t h, uint32_t flags, uint32_t *days)
+{
+    *days = 30;
+    return TA_OK;
+}
+
+int TA_SetTrialCallback(uint32_t h, TrialCallbackType callback, void *user) { return TA_OK; }
+int TA_SetCustomProxy(const char *address) { return TA_OK; }
+int TA_SetCustomActDataPath(const char *path) { return TA_OK; }
+
+int TA_GetVersion(uint32_t *major, uint32_t *minor, uint32_t *build, uint32_t *rev)
+{
+    *major = 4;
+    *minor = 4;
+    *build = 4;
+    *rev = 0;
+    return TA_OK;
+}
@@ -47,13 +47,6 @@ def trial_callback(status, unused):
 
 if __name__ == "__main__":
 
-    # support both Python 2 and 3
-    # for this simple example app
-    try:
-        input = raw_input
-    except NameError:
-        pass
-
     # now begins the licensing bit of the code
     isGenuine = False
 
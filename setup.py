@@ -1,7 +1,6 @@
 #!/usr/bin/env python
 
-import setuptools
-from distutils.core import setup
+from setuptools import setup
 
 setup(name="turboactivate",
       version="4.4.4.1",
@@ -18,10 +17,17 @@ setup(name="turboactivate",
           'License :: OSI Approved :: MIT License',
           'Topic :: Software Development :: Libraries :: Python Modules',
 		  'Programming Language :: Python',
-		  'Programming Language :: Python :: 2',
 		  'Programming Language :: Python :: 3',
+		  'Programming Language :: Python :: 3 :: Only',
       ],
+      python_requires=">=3.6",
       packages=["turboactivate"],
+      extras_require={
+          "opentelemetry": ["opentelemetry-api"],
+      },
+      entry_points={
+          "console_scripts": ["turboactivate = turboactivate.__main__:main"],
+      },
       long_description=open("README.md").read(),
       long_description_content_type="text/markdown"
 )
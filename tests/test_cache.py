@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+import unittest
+
+from turboactivate import IsGenuineResult, TurboActivate
+from turboactivate.fake import FakeTurboActivate
+
+GUID = "18324776654b3946fc44a5f3.49025204"
+KEY = "AAAA-BBBB-CCCC-DDDD-EEEE-FFFF-GGGG"
+
+
+class GenuineCacheTest(unittest.TestCase):
+
+    def test_revocation_is_cached(self):
+        fake = FakeTurboActivate(product_keys={KEY: {"seats": "5"}})
+        ta = TurboActivate(GUID, backend=fake, cache_ttl=60)
+        ta.check_and_save_pkey(KEY)
+        ta.activate()
+
+        self.assertEqual(ta.is_genuine(), IsGenuineResult.Genuine)
+        self.assertEqual(ta.get_feature_value("seats"), b"5")
+
+        fake.revoke(KEY)
+        ta.clear_cache()
+
+        # the check that finds the product revoked drops the cached state,
+        # and caches its own result in its place
+        self.assertEqual(ta.is_genuine(), IsGenuineResult.NotGenuine)
+        self.assertEqual(ta.is_genuine(), IsGenuineResult.NotGenuine)
+        self.assertEqual(fake.calls["TA_IsGenuine"], 2)
+        self.assertEqual(ta.get_feature_value("seats"), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
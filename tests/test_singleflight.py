@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+import unittest
+
+from turboactivate import IsGenuineResult, TurboActivate
+from turboactivate.c_wrapper import TurboActivateTimeoutError
+from turboactivate.fake import FakeTurboActivate
+
+GUID = "18324776654b3946fc44a5f3.49025204"
+KEY = "AAAA-BBBB-CCCC-DDDD-EEEE-FFFF-GGGG"
+
+
+class SingleFlightTimeoutTest(unittest.TestCase):
+
+    def setUp(self):
+        self.fake = FakeTurboActivate(product_keys=[KEY], latency={"TA_IsGenuine": 0.3,
+                                                                   "TA_Activate": 0.3})
+        self.ta = TurboActivate(GUID, backend=self.fake)
+        self.ta.check_and_save_pkey(KEY)
+
+    def _coalesced(self, call):
+        # The leader starts the call with a short timeout, and a waiter joins
+        # it with none: the leader's timeout must not become the waiter's result.
+        results = []
+
+        def wait():
+            time.sleep(0.05)
+
+            try:
+                results.append(call(None))
+            except Exception as e:
+                results.append(e)
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+
+        with self.assertRaises(TurboActivateTimeoutError):
+            call(0.1)
+
+        waiter.join()
+
+        return results[0]
+
+    def test_waiter_gets_result_after_leader_timeout(self):
+        self.ta.activate()
+
+        result = self._coalesced(lambda timeout: self.ta.is_genuine(timeout=timeout))
+
+        self.assertEqual(result, IsGenuineResult.Genuine)
+        self.assertEqual(self.fake.calls["TA_IsGenuine"], 1)
+        self.assertEqual(self.ta.coalescing_stats()["is_genuine"], {"calls": 2, "coalesced": 1})
+
+    def test_activate_waiter_after_leader_timeout(self):
+        result = self._coalesced(lambda timeout: self.ta.activate(timeout=timeout))
+
+        self.assertIsNone(result)
+        self.assertTrue(self.ta.is_activated())
+        self.assertEqual(self.fake.calls["TA_Activate"], 1)
+
+    def test_waiter_timeout(self):
+        self.ta.activate()
+        results = []
+
+        def leader():
+            results.append(self.ta.is_genuine())
+
+        thread = threading.Thread(target=leader)
+        thread.start()
+        time.sleep(0.05)
+
+        with self.assertRaises(TurboActivateTimeoutError):
+            self.ta.is_genuine(timeout=0.05)
+
+        thread.join()
+        self.assertEqual(results, [IsGenuineResult.Genuine])
+
+
+if __name__ == "__main__":
+    unittest.main()
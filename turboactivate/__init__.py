@@ -31,12 +31,15 @@
 # FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
 # IN THE SOFTWARE.
 
-from ctypes import pointer, sizeof, c_uint32, c_void_p
+from ctypes import pointer, sizeof, c_uint32
 
 from turboactivate.c_wrapper import *
+from turboactivate.cache import ResultCache, utc_timestamp
+from turboactivate.registry import registry
 
 import os
 import sys
+import time
 
 #
 # Object oriented interface
@@ -46,43 +49,168 @@ class IsGenuineResult:
     Genuine, GenuineFeaturesChanged, NotGenuine, NotGenuineInVM, InternetError = range(5)
 
 
-class TurboActivate(object):
+# How long trial_days_remaining() answers are cached. TurboActivate doesn't
+# say when the number of days goes down, so a positive number is only kept
+# for this many seconds (an expired trial stays expired until the cache is
+# cleared by a trial event or a license change).
+TRIAL_DAYS_CACHE_SECONDS = 60
 
-    def __init__(self, guid, flags = TA_USER, dat_file_loc = "", library_folder = ""):
 
-        # load the executing file's location
-        if getattr(sys, 'frozen', False):
-            # running in a bundle
-            execFileLoc = os.path.dirname(os.path.abspath(sys.executable))
-        else:
-            # running live
-            execFileLoc = os.path.dirname(os.path.abspath(sys.modules['__main__'].__file__))
+def _call_with_timeout(timeout, func, *args):
+    # Returns func(*args), raising TurboActivateTimeoutError after timeout
+    # seconds (see turboactivate.deadline, only imported when needed).
+    if timeout is None:
+        return func(*args)
+
+    from turboactivate.deadline import runner
+
+    return runner.call(timeout, func, *args)
+
+
+class TurboActivate(object):
+
+    def __init__(self, guid, flags = TA_USER, dat_file_loc = "", library_folder = "", cache_ttl = 0, lazy = False, retry = None, feature_schema = None, backend = None):
 
-        if not library_folder:
-            library_folder = execFileLoc
+        # a backend doesn't need the library (or, for the fake, a dat file)
+        if backend is None and (not library_folder or not dat_file_loc):
+            # load the executing file's location
+            if getattr(sys, 'frozen', False):
+                # running in a bundle
+                execFileLoc = os.path.dirname(os.path.abspath(sys.executable))
+            else:
+                # running live
+                execFileLoc = os.path.dirname(os.path.abspath(sys.modules['__main__'].__file__))
 
-        # form the full, absolute path to the TurboActivate.dat file
-        if not dat_file_loc:
-            dat_file_loc = os.path.join(execFileLoc, "TurboActivate.dat")
+            if not library_folder:
+                library_folder = execFileLoc
 
-        self._lib = load_library(library_folder)
-        self._set_restype()
+            # form the full, absolute path to the TurboActivate.dat file
+            if not dat_file_loc:
+                dat_file_loc = os.path.join(execFileLoc, "TurboActivate.dat")
 
+        self._guid = guid
         self._flags = flags
+        self._dat_file_loc = dat_file_loc
+        self._library_folder = library_folder
 
-        try:
-            self._lib.TA_PDetsFromPath(wstr(dat_file_loc))
-        except TurboActivateFailError:
-            # The dat file is already loaded
-            pass
+        # The object the TA_* functions are called on instead of the library
+        # in library_folder (see turboactivate.backend)
+        self._backend = backend
+
+        # Optionally cache the results of is_genuine() and is_genuine_ex() for
+        # cache_ttl seconds. Expired results are still returned while a single
+        # background thread re-checks with the native library.
+        self._genuine_cache = ResultCache(cache_ttl) if cache_ttl > 0 else None
+
+        # Optional turboactivate.retry.RetryPolicy for the calls that go to
+        # the LimeLM servers.
+        self._retry = retry
+
+        # Optional {name: type} dict (or FeatureSchema) of the features to
+        # serve as typed values from ta.features (see turboactivate.features).
+        if feature_schema is not None:
+            from turboactivate.features import FeatureSchema
+
+            if not isinstance(feature_schema, FeatureSchema):
+                feature_schema = FeatureSchema(feature_schema)
+
+        self._feature_schema = feature_schema
 
-        self._handle = self._lib.TA_GetHandle(wstr(guid))
+        # (LicenseState generation, FeatureSnapshot) of the last ta.features
+        self._typed_features = None
 
-        # if the handle is still unset then immediately throw an exception
-        # telling the user that they need to actually load the correct
-        # TurboActivate.dat and/or use the correct GUID for the TurboActivate.dat
-        if self._handle == 0:
-            raise TurboActivateDatFileError()
+        # The library, dat file, handle, and cached license state are shared by
+        # every TurboActivate object using the same files and GUID (see
+        # turboactivate.state for the concurrency model). This raises if the
+        # GUID doesn't match the TurboActivate.dat file. With lazy=True they're
+        # only loaded (and the errors only raised) by the first call that needs them.
+        if not lazy:
+            self._load()
+
+    def _load(self):
+        lib, handle = registry.get_handle(self._library_folder, self._dat_file_loc, self._guid,
+                                          self._backend)
+        shared = registry.get_state(lib, handle)
+
+        if self._genuine_cache is not None:
+            shared.add_cache(self._genuine_cache)
+
+        self._lib, self._handle, self._shared = lib, handle, shared
+
+    def __getattr__(self, name):
+        # Only called for attributes that aren't set yet, which is how lazy
+        # TurboActivate objects load the library and handle on first use.
+        if name in ("_lib", "_handle", "_shared"):
+            self._load()
+            return self.__dict__[name]
+
+        raise AttributeError(name)
+
+    def __reduce__(self):
+        # Pickled as the constructor arguments, and rebuilt as a lazy object:
+        # unpickling doesn't touch the library, and the first call loads
+        # it through the registry (which, in a forked child, already has it).
+        # Trial callbacks aren't pickled, set them again in the new process.
+        cache_ttl = self._genuine_cache.ttl if self._genuine_cache is not None else 0
+
+        return (type(self), (self._guid, self._flags, self._dat_file_loc, self._library_folder,
+                             cache_ttl, True, self._retry, self._feature_schema, self._backend))
+
+    def warm_up(self, features=()):
+        """
+        Does all the one-time work of the calls on this object ahead of time:
+        loads the library, the TurboActivate.dat file, and the handle (for
+        lazy objects), the values of the features named in "features" and
+        in the feature_schema, and the modules used by the calls with a
+        timeout. Returns self.
+
+        Pre-fork servers (gunicorn, uwsgi, multiprocessing with "fork") can
+        call this in the master process so that the workers share all of it
+        copy-on-write and start without any native initialization:
+
+            ta = TurboActivate(GUID).warm_up(features=["seats"])
+
+            # in gunicorn's config, for example
+            preload_app = True
+
+        Register trial callbacks (use_trial(callback=...), trial_events) in
+        the workers rather than before forking. TurboActivate objects can
+        also be pickled (for multiprocessing's "spawn" and "forkserver"
+        start methods): they're rebuilt lazily in the new process.
+        """
+        import turboactivate.deadline
+
+        if "_shared" not in self.__dict__:
+            self._load()
+
+        for name in features:
+            self.get_feature_value(name)
+
+        # caches the typed snapshot too
+        if self._feature_schema is not None:
+            self.features
+
+        # the output buffer of this thread, inherited by a child's main thread
+        thread_buffer()
+
+        return self
+
+    def _network(self, func, *args):
+        # Calls func(*args), which goes to the LimeLM servers, through the
+        # retry policy (if any).
+        if self._retry is None:
+            return func(*args)
+
+        return self._retry.call(func, *args)
+
+    def _change_trial(self, func, *args):
+        # Calls func(*args) holding the handle's lock, then drops the cached
+        # trial days. Passed to _network() so the lock isn't held while
+        # waiting between retries.
+        with self._shared.lock:
+            func(*args)
+
+            self._shared.expiry.invalidate()
 
     #
     # Public
@@ -92,7 +220,10 @@ class TurboActivate(object):
 
     def check_and_save_pkey(self, product_key):
         """Checks and saves the product key."""
-        ret = self._lib.TA_CheckAndSavePKey(self._handle, wstr(product_key), self._flags)
+        with self._shared.lock:
+            ret = self._lib.TA_CheckAndSavePKey(self._handle, wstr(product_key), self._flags)
+
+            self._shared.invalidate()
 
         if ret == TA_OK:
             return True
@@ -118,11 +249,10 @@ class TurboActivate(object):
         Gets the stored product key. NOTE: if you want to check if a product key is valid
         simply call is_product_key_valid().
         """
-        buf_size = 35
-        buf = wbuf(buf_size)
+        buf = thread_buffer()
 
         try:
-            self._lib.TA_GetPKey(self._handle, buf, buf_size)
+            self._lib.TA_GetPKey(self._handle, buf, len(buf))
 
             return buf.value
         except TurboActivateProductKeyError:
@@ -131,18 +261,26 @@ class TurboActivate(object):
 
     # Activation status
 
-    def deactivate(self, erase_p_key=False):
+    def deactivate(self, erase_p_key=False, timeout=None):
         """
         Deactivates the product on this computer. Set erasePkey to 1 to erase the stored
         product key, 0 to keep the product key around. If you're using deactivate to let
         a user move between computers it's almost always best to *not* erase the product
         key. This way you can just use TA_Activate() when the user wants to reactivate
         instead of forcing the user to re-enter their product key over-and-over again.
+
+        Raises TurboActivateTimeoutError if it takes more than timeout seconds.
         """
 
         args = 1 if erase_p_key else 0
 
-        self._lib.TA_Deactivate(self._handle, args)
+        def deactivate():
+            with self._shared.lock:
+                self._lib.TA_Deactivate(self._handle, args)
+
+                self._shared.invalidate()
+
+        _call_with_timeout(timeout, self._network, deactivate)
 
     def deactivation_request_to_file(self, filename, erase_p_key=False):
         """
@@ -161,24 +299,36 @@ class TurboActivate(object):
         else:
             args.append(0)
 
-        self._lib.TA_DeactivationRequestToFile(self._handle, *args)
+        with self._shared.lock:
+            self._lib.TA_DeactivationRequestToFile(self._handle, *args)
+
+            self._shared.invalidate()
 
-    def activate(self, extra_data=""):
+    def activate(self, extra_data="", timeout=None):
         """
         Activates the product on this computer. You must call set_product_key()
         with a valid product key or have used the TurboActivate wizard sometime
         before calling this function.
+
+        Raises TurboActivateTimeoutError if it takes more than timeout seconds.
         """
 
         if extra_data:
             options = ACTIVATE_OPTIONS(sizeof(ACTIVATE_OPTIONS()),
-                                      wstr(extra_data))
+                                      cached_wstr(extra_data))
 
             args = pointer(options)
         else:
             args = None
 
-        self._lib.TA_Activate(self._handle, args)
+        # concurrent activations with the same extra data make one call
+        def activate():
+            with self._shared.lock:
+                self._lib.TA_Activate(self._handle, args)
+
+                self._shared.invalidate()
+
+        self._shared.flights.do(("activate", extra_data), lambda: self._network(activate), timeout)
 
     def activation_request_to_file(self, filename, extra_data=""):
         """
@@ -190,7 +340,7 @@ class TurboActivate(object):
 
         if extra_data:
             options = ACTIVATE_OPTIONS(sizeof(ACTIVATE_OPTIONS()),
-                                      wstr(extra_data))
+                                      cached_wstr(extra_data))
 
             args.append(pointer(options))
         else:
@@ -201,15 +351,17 @@ class TurboActivate(object):
     def activate_from_file(self, filename):
         """Activate from the "activation response" file for offline activation."""
 
-        self._lib.TA_ActivateFromFile(self._handle, wstr(filename))
+        with self._shared.lock:
+            self._lib.TA_ActivateFromFile(self._handle, wstr(filename))
+
+            self._shared.invalidate()
 
     def get_extra_data(self):
         """Gets the extra data you passed in using activate()"""
-        buf_size = 255
-        buf = wbuf(buf_size)
+        buf = thread_buffer()
 
         try:
-            self._lib.TA_GetExtraData(self._handle, buf, buf_size)
+            self._lib.TA_GetExtraData(self._handle, buf, len(buf))
 
             return buf.value
         except TurboActivateFailError:
@@ -234,22 +386,99 @@ class TurboActivate(object):
         return len(self.get_feature_value(name)) > 0
 
     def get_feature_value(self, name):
-        """Gets the value of a feature."""
-        buf_size = self._lib.TA_GetFeatureValue(self._handle, wstr(name), 0, 0)
-        buf = wbuf(buf_size)
+        """
+        Gets the value of a feature. Values (including the empty value of
+        features that don't exist) are cached until the license changes.
+        """
+        state = self._shared.state
+        value = state.features.get(name)
+
+        if value is None:
+            value = self._get_feature_value(name)
+            self._shared.cache_feature(state.generation, name, value)
+
+        return value
+
+    def get_feature_values(self, names):
+        """Gets the values of several features at once as a dict keyed by name."""
+        return dict((name, self.get_feature_value(name)) for name in names)
+
+    @property
+    def features(self):
+        """
+        The features in the feature_schema passed to the constructor, as an
+        immutable snapshot with one typed attribute per feature. The values
+        are parsed again only after the license state changes. Raises
+        FeatureValueError if a value doesn't match its type.
+        """
+        if self._feature_schema is None:
+            raise ValueError("no feature_schema was passed to TurboActivate()")
+
+        generation = self._shared.state.generation
+        typed = self._typed_features
+
+        if typed is not None and typed[0] == generation:
+            return typed[1]
 
-        self._lib.TA_GetFeatureValue(self._handle, wstr(name), buf, buf_size)
+        snapshot = self._feature_schema.load(self.get_feature_value)
+        self._typed_features = (generation, snapshot)
+
+        return snapshot
+
+    def _get_feature_value(self, name):
+        name = cached_wstr(name)
+        buf = thread_buffer()
+        ret = self._lib.TA_GetFeatureValue(self._handle, name, buf, len(buf))
+
+        # Only values that don't fit the thread's buffer need the size probe.
+        if ret == TA_E_INSUFFICIENT_BUFFER:
+            buf = thread_buffer(self._lib.TA_GetFeatureValue(self._handle, name, None, 0))
+            ret = self._lib.TA_GetFeatureValue(self._handle, name, buf, len(buf))
+
+        if ret != TA_OK:
+            # the feature doesn't exist (its value is empty)
+            return wbuf(0).value
 
         return buf.value
 
     # Genuine
 
-    def is_genuine(self):
+    def is_genuine(self, timeout=None):
         """
         Checks whether the computer is genuinely activated by verifying with the LimeLM servers.
         If reactivation is needed then it will do this as well.
+
+        Raises TurboActivateTimeoutError if it takes more than timeout seconds.
         """
-        ret = self._lib.TA_IsGenuine(self._handle)
+        return self._check_genuine(("is_genuine",), self._is_genuine, timeout)
+
+    def _check_genuine(self, key, check, timeout):
+        # Concurrent checks with the same key share one native call (see
+        # HandleState.flights), and with cache_ttl set the result is cached.
+        def fetch():
+            return self._shared.flights.do(key, lambda: self._genuine_checked(key, check()),
+                                           timeout)
+
+        if self._genuine_cache is not None:
+            return self._genuine_cache.get(key, fetch)
+
+        return fetch()
+
+    def _genuine_checked(self, key, result):
+        if result in (IsGenuineResult.Genuine, IsGenuineResult.GenuineFeaturesChanged):
+            self._shared.genuine_checked(True, key, result)
+        elif result == IsGenuineResult.NotGenuine:
+            # the library has deactivated the product: drop its state
+            self._shared.genuine_checked(False, key, result)
+
+        return result
+
+    def _is_genuine(self):
+        try:
+            ret = self._network(self._lib.TA_IsGenuine, self._handle)
+        except TurboActivateCircuitOpenError:
+            # the servers are known to be unreachable: same as being offline
+            return IsGenuineResult.InternetError
 
         if ret == TA_OK:
             return IsGenuineResult.Genuine
@@ -260,17 +489,30 @@ class TurboActivate(object):
         elif ret == TA_E_IN_VM:
             return IsGenuineResult.NotGenuineInVM
         elif ret == TA_E_FEATURES_CHANGED:
+            self._shared.clear_features()
             return IsGenuineResult.GenuineFeaturesChanged
 
         validate_result(ret)
 
     # IsGenuineEx
 
-    def is_genuine_ex(self, days_between_checks, grace_days_on_inet_err, skip_offline = False, offline_show_inet_err = False):
+    def is_genuine_ex(self, days_between_checks, grace_days_on_inet_err, skip_offline = False, offline_show_inet_err = False, timeout = None):
         """
         Checks whether the computer is genuinely activated by verifying with the LimeLM servers.
         If reactivation is needed then it will do this as well.
+
+        Raises TurboActivateTimeoutError if it takes more than timeout seconds.
         """
+        key = ("is_genuine_ex", days_between_checks, grace_days_on_inet_err,
+               skip_offline, offline_show_inet_err)
+
+        return self._check_genuine(
+            key,
+            lambda: self._is_genuine_ex(days_between_checks, grace_days_on_inet_err,
+                                        skip_offline, offline_show_inet_err),
+            timeout)
+
+    def _is_genuine_ex(self, days_between_checks, grace_days_on_inet_err, skip_offline, offline_show_inet_err):
         flags = 0
 
         if skip_offline:
@@ -284,7 +526,11 @@ class TurboActivate(object):
                                   days_between_checks,
                                   grace_days_on_inet_err)
 
-        ret = self._lib.TA_IsGenuineEx(self._handle, pointer(options))
+        try:
+            ret = self._network(self._lib.TA_IsGenuineEx, self._handle, pointer(options))
+        except TurboActivateCircuitOpenError:
+            # the servers are known to be unreachable: same as being offline
+            return IsGenuineResult.InternetError
 
         if ret == TA_OK:
             return IsGenuineResult.Genuine
@@ -295,35 +541,52 @@ class TurboActivate(object):
         elif ret == TA_E_IN_VM:
             return IsGenuineResult.NotGenuineInVM
         elif ret == TA_E_FEATURES_CHANGED:
+            self._shared.clear_features()
             return IsGenuineResult.GenuineFeaturesChanged
 
         validate_result(ret)
 
     # Trial
 
-    def use_trial(self, verified=True, extra_data="", callback = None):
+    def use_trial(self, verified=True, extra_data="", callback = None, timeout = None):
         """
         Begins the trial the first time it's called. Calling it again will validate the trial
         data hasn't been tampered with.
+
+        Raises TurboActivateTimeoutError if it takes more than timeout seconds.
         """
         flags = TA_VERIFIED_TRIAL | self._flags if verified else TA_UNVERIFIED_TRIAL | self._flags
 
         args = [flags]
 
         if extra_data:
-            args.append(wstr(extra_data))
+            args.append(cached_wstr(extra_data))
         else:
             args.append(None)
 
-        # Set the trial callback
+        # Set the trial callback. The native callback is registered once
+        # per handle (and kept alive) by the handle's TrialEvents.
         if callback is not None:
-            # "cast" the native python function to TrialCallback type
-            # save it locally so that it acutally works when it's called
-            # back
-            self._callback = TrialCallback(callback)
-            self._lib.TA_SetTrialCallback(self._handle, self._callback, c_void_p(0))
+            self.trial_events.set_callback(callback)
+
+        _call_with_timeout(timeout, self._network, self._change_trial, self._lib.TA_UseTrial, self._handle, *args)
+
+    @property
+    def trial_events(self):
+        """
+        The TrialEvents of this handle, to subscribe any number of callbacks,
+        queues, or asyncio loops to the trial expiration events.
+        """
+        shared = self._shared
+
+        if shared.trial_events is None:
+            from turboactivate.events import TrialEvents
 
-        self._lib.TA_UseTrial(self._handle, *args)
+            with shared.lock:
+                if shared.trial_events is None:
+                    shared.trial_events = TrialEvents(self._lib, self._handle, expiry=shared.expiry)
+
+        return shared.trial_events
 
     def trial_days_remaining(self, verified=True):
         """
@@ -334,35 +597,108 @@ class TurboActivate(object):
         You must have called "use_trial" o use this function
         """
         flags = TA_VERIFIED_TRIAL | self._flags if verified else TA_UNVERIFIED_TRIAL | self._flags
+        expiry = self._shared.expiry
+        key = ("trial_days_remaining", flags)
+
+        cached = expiry.get(key)
+
+        if cached is not None:
+            return cached
+
+        generation = expiry.generation
         days = c_uint32(0)
 
         self._lib.TA_TrialDaysRemaining(self._handle, flags, pointer(days))
 
+        until = float("inf") if days.value == 0 else time.time() + TRIAL_DAYS_CACHE_SECONDS
+        expiry.put(key, days.value, until, generation)
+
         return days.value
 
-    def extend_trial(self, extension_code, verified=True):
-        """Extends the trial using a trial extension created in LimeLM."""
+    def extend_trial(self, extension_code, verified=True, timeout=None):
+        """
+        Extends the trial using a trial extension created in LimeLM.
+        Raises TurboActivateTimeoutError if it takes more than timeout seconds.
+        """
 
         flags = TA_VERIFIED_TRIAL | self._flags if verified else TA_UNVERIFIED_TRIAL | self._flags
 
-        self._lib.TA_ExtendTrial(self._handle, flags, wstr(extension_code))
+        _call_with_timeout(timeout, self._network, self._change_trial, self._lib.TA_ExtendTrial,
+                           self._handle, flags, wstr(extension_code))
 
     # Utils
 
+    def clear_cache(self):
+        """
+        Drops any cached license state (genuine results and feature values)
+        of every TurboActivate object using this handle. This is done
+        automatically after activating, deactivating, or saving a new product key.
+        """
+        self._shared.invalidate()
+
+    def coalescing_stats(self):
+        """
+        Returns how many is_genuine(), is_genuine_ex(), and activate() calls
+        were made on this handle, and how many of them were coalesced with a
+        call another thread already had in flight, as
+        {"is_genuine": {"calls": n, "coalesced": n}, ...}.
+        """
+        return self._shared.flights.stats()
+
+    def trace(self, path, sample_rate=1.0):
+        """
+        Returns a context manager that traces the native calls on this
+        object's handle to the Chrome trace event file "path":
+
+            with ta.trace("trace.json"):
+                ta.activate()
+
+        See turboactivate.tracing.
+        """
+        from turboactivate.tracing import ChromeTraceWriter, Tracer
+
+        return Tracer([ChromeTraceWriter(path)], sample_rate, self._handle)
+
+    @property
+    def state(self):
+        """
+        The cached license state, as an immutable LicenseState. Reading it never
+        blocks, and a new object is published whenever the state changes.
+        """
+        return self._shared.state
+
     def is_date_valid(self, date):
         """
-        Check if the date is valid
+        Check if the date is valid. The answer is cached until the date passes
+        (or, for dates that have passed, until the wall clock goes back).
         """
+        expiry = self._shared.expiry
+        key = ("is_date_valid", date)
 
-        try:
-            self._lib.TA_IsDateValid(self._handle, wstr(date), TA_HAS_NOT_EXPIRED)
+        cached = expiry.get(key)
 
-            return True
+        if cached is not None:
+            return cached
+
+        generation = expiry.generation
+
+        try:
+            self._lib.TA_IsDateValid(self._handle, cached_wstr(date), TA_HAS_NOT_EXPIRED)
         except TurboActivateFlagsError as e:
             raise e
-        except TurboActivateError:
+        except TurboActivateError as e:
+            if e.return_code == TA_E_EXPIRED:
+                expiry.put(key, False, float("inf"), generation)
+
             return False
 
+        until = utc_timestamp(date)
+
+        if until is not None:
+            expiry.put(key, True, until, generation)
+
+        return True
+
     def set_custom_act_data_path(self, path):
         """
         This function allows you to set a custom folder to store the activation
@@ -413,21 +749,3 @@ class TurboActivate(object):
         self._lib.TA_GetVersion(pointer(major), pointer(minor), pointer(build), pointer(rev))
 
         return major.value, minor.value, build.value, rev.value
-
-    def _set_restype(self):
-        self._lib.TA_PDetsFromPath.restype = validate_result
-        self._lib.TA_UseTrial.restype = validate_result
-        self._lib.TA_GetPKey.restype = validate_result
-        self._lib.TA_IsProductKeyValid.restype = validate_result
-        self._lib.TA_DeactivationRequestToFile.restype = validate_result
-        self._lib.TA_Deactivate.restype = validate_result
-        self._lib.TA_Activate.restype = validate_result
-        self._lib.TA_ActivationRequestToFile.restype = validate_result
-        self._lib.TA_ActivateFromFile.restype = validate_result
-        self._lib.TA_GetExtraData.restype = validate_result
-        self._lib.TA_TrialDaysRemaining.restype = validate_result
-        self._lib.TA_ExtendTrial.restype = validate_result
-        self._lib.TA_IsDateValid.restype = validate_result
-        self._lib.TA_SetCustomProxy.restype = validate_result
-        self._lib.TA_SetCustomActDataPath.restype = validate_result
-        self._lib.TA_SetTrialCallback.restype = validate_result
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+Prints the license status as a single JSON document, for health checks and
+scripts:
+
+    python -m turboactivate status --guid 18324776654b3946fc44a5f3.49025204
+    python -m turboactivate features --guid ... seats expires
+    python -m turboactivate trial --guid ...
+    python -m turboactivate version
+
+None of the commands change the license state, except for "trial --start"
+(which starts the trial, contacting the servers for verified trials).
+
+The TurboActivate library and TurboActivate.dat are loaded from the current
+directory unless --library-folder and --dat say otherwise. The GUID can also
+be set with the TURBOACTIVATE_GUID environment variable.
+
+Exit codes: 0 if the product is genuinely activated (or in trial, for
+"trial"), 1 if it isn't, 2 on errors.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from turboactivate import (
+    IsGenuineResult,
+    TurboActivate,
+    TurboActivateError,
+    TurboActivateMustUseTrialError,
+    TA_SYSTEM,
+    TA_USER,
+)
+
+
+GENUINE_RESULT_NAMES = dict((getattr(IsGenuineResult, name), name)
+                            for name in dir(IsGenuineResult) if not name.startswith("_"))
+
+# the results that mean the product can be used (same as the example app)
+USABLE_RESULTS = (IsGenuineResult.Genuine,
+                  IsGenuineResult.GenuineFeaturesChanged,
+                  IsGenuineResult.InternetError)
+
+
+def _text(value):
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def _turboactivate(args):
+    return TurboActivate(args.guid,
+                         TA_SYSTEM if args.system else TA_USER,
+                         dat_file_loc=args.dat or os.path.join(args.library_folder, "TurboActivate.dat"),
+                         library_folder=args.library_folder,
+                         lazy=True)
+
+
+def status(args):
+    ta = _turboactivate(args)
+    result = ta.is_genuine_ex(args.days_between_checks, args.grace_days, args.skip_offline)
+
+    return result in USABLE_RESULTS, {
+        "activated": ta.is_activated(),
+        "genuine": GENUINE_RESULT_NAMES[result],
+    }
+
+
+def features(args):
+    ta = _turboactivate(args)
+    values = ta.get_feature_values(args.names)
+
+    return True, {"features": dict((name, _text(value)) for name, value in values.items())}
+
+
+def trial(args):
+    ta = _turboactivate(args)
+    verified = not args.unverified
+
+    # use_trial() starts the trial the first time, so it's only called when asked to
+    if args.start:
+        ta.use_trial(verified)
+
+    try:
+        days = ta.trial_days_remaining(verified)
+    except TurboActivateMustUseTrialError:
+        return False, {"trial": "none", "trial_days": None, "verified": verified}
+
+    return days > 0, {"trial": "active" if days > 0 else "expired", "trial_days": days,
+                      "verified": verified}
+
+
+def version(args):
+    from ctypes import c_uint32, pointer
+
+    from turboactivate.registry import registry
+
+    lib = registry.get_library(args.library_folder)
+    parts = [c_uint32(0) for _ in range(4)]
+
+    lib.TA_GetVersion(*[pointer(part) for part in parts])
+
+    return True, {"version": ".".join(str(part.value) for part in parts)}
+
+
+def _parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--library-folder", default=os.getcwd(),
+                        help="folder with the TurboActivate library (default: the current directory)")
+    common.add_argument("--dat", help="path to TurboActivate.dat (default: in the library folder)")
+    common.add_argument("--guid", default=os.environ.get("TURBOACTIVATE_GUID"),
+                        help="the version GUID (default: $TURBOACTIVATE_GUID)")
+    common.add_argument("--system", action="store_true",
+                        help="use the system-wide activation (TA_SYSTEM) instead of TA_USER")
+
+    parser = argparse.ArgumentParser(prog="python -m turboactivate",
+                                     description="Print the TurboActivate license status as JSON.")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    command = commands.add_parser("status", parents=[common], help="activation and genuine status")
+    command.add_argument("--days-between-checks", type=int, default=90)
+    command.add_argument("--grace-days", type=int, default=14)
+    command.add_argument("--skip-offline", action="store_true",
+                         help="don't report internet errors for offline activations")
+    command.set_defaults(func=status)
+
+    command = commands.add_parser("features", parents=[common], help="feature values")
+    command.add_argument("names", nargs="+", metavar="NAME")
+    command.set_defaults(func=features)
+
+    command = commands.add_parser("trial", parents=[common], help="trial days remaining")
+    command.add_argument("--unverified", action="store_true", help="use unverified trials")
+    command.add_argument("--start", action="store_true",
+                         help="start the trial (use_trial()) if it hasn't been started yet")
+    command.set_defaults(func=trial)
+
+    command = commands.add_parser("version", parents=[common], help="TurboActivate library version")
+    command.set_defaults(func=version)
+
+    return parser
+
+
+def main(argv=None):
+    parser = _parser()
+    args = parser.parse_args(argv)
+
+    if args.func is not version and not args.guid:
+        parser.error("the version GUID is required (--guid or TURBOACTIVATE_GUID)")
+
+    try:
+        ok, document = args.func(args)
+        code = 0 if ok else 1
+    except TurboActivateError as e:
+        document = {"error": type(e).__name__, "return_code": e.return_code}
+        code = 2
+    except OSError as e:
+        # the TurboActivate library couldn't be loaded
+        document = {"error": type(e).__name__, "message": str(e)}
+        code = 2
+
+    json.dump(document, sys.stdout, sort_keys=True)
+    sys.stdout.write("\n")
+
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
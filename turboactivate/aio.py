@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+asyncio front-end for the TurboActivate class (Python 3.7+).
+
+    from turboactivate import TurboActivate
+    from turboactivate.aio import AsyncTurboActivate
+
+    ta = AsyncTurboActivate(TurboActivate("18324776654b3946fc44a5f3.49025204"))
+
+    gen_r = await ta.is_genuine_ex(90, 14, True, timeout=10)
+
+Every method returns an asyncio future, so it can be awaited, cancelled, or
+wrapped in asyncio.wait() like any other future. Cancelling a future frees
+the awaiting coroutine immediately. The timeout is passed to the
+TurboActivate method (see turboactivate.deadline), so hitting it frees the
+executor's thread too. Either way the native call itself can't be
+interrupted and finishes in the background.
+
+Lazy TurboActivate objects are loaded on the executor, by the first call
+or by warm_up():
+
+    ta = await AsyncTurboActivate(TurboActivate(guid, lazy=True)).warm_up()
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from turboactivate import _call_with_timeout
+from turboactivate.registry import register_after_fork
+
+
+# Functions that can block on the network or disk, or that take the handle's
+# lock (which activate(), deactivate(), and use_trial() hold for their whole
+# network call). These always run on the executor so they never block the
+# event loop.
+_BLOCKING_METHODS = (
+    "activate",
+    "activate_from_file",
+    "activation_request_to_file",
+    "check_and_save_pkey",
+    "deactivate",
+    "deactivation_request_to_file",
+    "extend_trial",
+    "is_genuine",
+    "is_genuine_ex",
+    "use_trial",
+)
+
+# The blocking functions with a timeout parameter of their own. The others
+# are given one by _call_with_timeout().
+_TIMEOUT_METHODS = frozenset((
+    "activate",
+    "deactivate",
+    "extend_trial",
+    "is_genuine",
+    "is_genuine_ex",
+    "use_trial",
+))
+
+# Functions that only read local state. These are fast enough to be called
+# directly from the event loop thread.
+_LOCAL_METHODS = (
+    "clear_cache",
+    "get_extra_data",
+    "get_feature_value",
+    "get_feature_values",
+    "get_pkey",
+    "get_version",
+    "has_feature",
+    "is_activated",
+    "is_date_valid",
+    "is_product_key_valid",
+    "set_custom_act_data_path",
+    "set_custom_proxy",
+    "trial_days_remaining",
+)
+
+
+class AsyncTurboActivate(object):
+
+    def __init__(self, ta, max_workers=4, timeout=None, offload_local=False):
+        """
+        Wraps the TurboActivate object "ta". Blocking calls run on a dedicated
+        pool of at most max_workers threads. timeout is the default number of
+        seconds to wait for a blocking call (None waits forever). Set
+        offload_local to True to run the local-only calls on the pool too.
+        """
+        self.ta = ta
+        self.timeout = timeout
+
+        self._offload_local = offload_local
+        self._max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="turboactivate")
+
+        register_after_fork(self)
+
+    def close(self, wait=True):
+        """Shuts down the executor. Pending calls are finished first if wait is True."""
+        self._executor.shutdown(wait=wait)
+
+    def _after_fork(self):
+        # the pool's threads weren't copied to the child
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                            thread_name_prefix="turboactivate")
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close(wait=False)
+
+    def warm_up(self, features=()):
+        """
+        Same as TurboActivate.warm_up(), run on the executor. The future's
+        result is this object.
+        """
+        def warm_up():
+            self.ta.warm_up(features)
+            return self
+
+        return asyncio.get_running_loop().run_in_executor(self._executor, warm_up)
+
+    def _submit(self, func, args, kwargs, timeout, has_timeout=False):
+        if timeout is None:
+            timeout = self.timeout
+
+        if timeout is not None:
+            # The call times out on the executor's thread rather than in
+            # the loop, so the thread isn't held by an abandoned call.
+            if has_timeout:
+                kwargs = dict(kwargs, timeout=timeout)
+            else:
+                func = functools.partial(_call_with_timeout, timeout, func)
+
+        return asyncio.get_running_loop().run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs))
+
+    def _local(self, func, args, kwargs):
+        # a lazy object that isn't loaded yet would load on the loop's thread
+        if self._offload_local or "_handle" not in vars(self.ta):
+            return self._submit(func, args, kwargs, None)
+
+        future = asyncio.get_running_loop().create_future()
+
+        try:
+            future.set_result(func(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+
+        return future
+
+
+def _blocking_method(name):
+    def method(self, *args, timeout=None, **kwargs):
+        return self._submit(getattr(self.ta, name), args, kwargs, timeout,
+                            name in _TIMEOUT_METHODS)
+
+    method.__name__ = name
+    method.__doc__ = "Same as TurboActivate.%s(), run on the executor." % name
+
+    return method
+
+
+def _local_method(name):
+    def method(self, *args, **kwargs):
+        return self._local(getattr(self.ta, name), args, kwargs)
+
+    method.__name__ = name
+    method.__doc__ = "Same as TurboActivate.%s()." % name
+
+    return method
+
+
+for _name in _BLOCKING_METHODS:
+    setattr(AsyncTurboActivate, _name, _blocking_method(_name))
+
+for _name in _LOCAL_METHODS:
+    setattr(AsyncTurboActivate, _name, _local_method(_name))
+
+del _name
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+The interface between the TurboActivate objects and the library.
+
+A backend is any object with an attribute for each function in
+c_wrapper.TA_FUNCTIONS, called with the same arguments as the ctypes
+function and handling the return code the same way: the TA_CHECKED
+functions raise the TurboActivateError of any return code but TA_OK, the
+others return it. The TurboActivate library loaded by the registry (a
+ctypes CDLL bound with c_wrapper.bind_library()) is one; pass another one
+to TurboActivate(backend=...) to use it instead:
+
+    from turboactivate.fake import FakeTurboActivate
+
+    ta = TurboActivate(guid, backend=FakeTurboActivate(product_keys=["AAAA-..."]))
+
+Functions the backend doesn't have are treated like functions missing from
+an old version of the library.
+"""
+
+from turboactivate.c_wrapper import TA_CHECKED, TA_FUNCTIONS, TA_OK, validate_result
+
+
+class PythonBackend(object):
+
+    """
+    A base class for the backends written in Python. Subclasses implement the
+    TA_* functions as methods that return the TA_* return code, and the
+    constructor makes the TA_CHECKED ones raise like the library's do.
+    """
+
+    def __init__(self):
+        for name, (handling, _, _) in TA_FUNCTIONS.items():
+            method = getattr(self, name, None)
+
+            if method is not None and handling == TA_CHECKED:
+                setattr(self, name, _checked(method))
+
+
+def _checked(method):
+    def checked(*args):
+        return_code = method(*args)
+
+        if return_code != TA_OK:
+            validate_result(return_code)
+
+        return return_code
+
+    checked.__name__ = method.__name__
+    checked.__doc__ = method.__doc__
+
+    return checked
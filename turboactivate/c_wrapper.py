@@ -32,14 +32,20 @@
 # IN THE SOFTWARE.
 
 import sys
+import threading
+from functools import lru_cache
 from os import path as ospath
 from ctypes import (
     cdll,
+    c_char,
+    c_int,
+    c_size_t,
     c_uint,
     c_uint32,
     c_void_p,
     c_char_p,
     c_wchar_p,
+    POINTER,
     Structure,
     create_string_buffer,
     create_unicode_buffer,
@@ -48,9 +54,6 @@ from ctypes import (
 
 # Utilities
 
-# python 2.7 string.encode('utf-8') returns an str class
-# python 3.6 string.encode('utf-8') returns a bytes class
-
 is_win = sys.platform == "win32"
 
 wbuf = create_unicode_buffer if is_win else create_string_buffer
@@ -58,12 +61,52 @@ wbuf = create_unicode_buffer if is_win else create_string_buffer
 wstr_type = c_wchar_p if is_win else c_char_p
 
 
+# Converts a string to what wstr_type expects. Picked once at import time:
+# strings have to be UTF-8 encoded everywhere but Windows.
+if not is_win:
+    def _to_wstr_value(string):
+        return string.encode('utf-8') if isinstance(string, str) else string
+else:
+    def _to_wstr_value(string):
+        return string
+
+
 class wstr(wstr_type):
     def __init__(self, string):
-        if sys.version_info > (3, 0) and isinstance(string, str):
-            super(wstr, self).__init__(string.encode('utf-8') if not is_win else string)
-        else:
-            super(wstr, self).__init__(string)
+        super(wstr, self).__init__(_to_wstr_value(string))
+
+
+# The most strings cached_wstr() keeps around.
+WSTR_CACHE_SIZE = 256
+
+cached_wstr = lru_cache(maxsize=WSTR_CACHE_SIZE)(wstr)
+
+cached_wstr.__doc__ = """
+Returns a shared, already encoded wstr for strings that are passed over and
+over again (the version GUID, feature names, dates, ...). Only use it for
+strings that are read by the native function, never for output buffers.
+"""
+
+
+# The size (in characters) of the per-thread output buffers. Big enough for
+# a product key and the extra data (at most 255 characters).
+THREAD_BUFFER_SIZE = 256
+
+_thread_buffers = threading.local()
+
+
+def thread_buffer(size=THREAD_BUFFER_SIZE):
+    """
+    Returns the calling thread's output buffer (a wbuf), grown to at least
+    size characters if needed. It's reused by every call on the thread, so
+    copy its value out before the next native call.
+    """
+    buf = getattr(_thread_buffers, "buf", None)
+
+    if buf is None or len(buf) < size:
+        buf = _thread_buffers.buf = wbuf(max(size, THREAD_BUFFER_SIZE))
+
+    return buf
 
 
 # Wrapper
@@ -211,73 +254,94 @@ def load_library(path):
     return cdll.LoadLibrary(ospath.join(path, 'libTurboActivate.so'))
 
 
+# Native function signatures.
+#
+# How the return value of each function is handled:
+#
+#   TA_CHECKED - an HRESULT checked by errcheck. Anything but TA_OK raises
+#                the matching TurboActivateError.
+#   TA_STATUS  - an HRESULT returned as is, for functions where more than
+#                one return code is an expected answer (e.g. TA_IsGenuine).
+#   TA_VALUE   - not an HRESULT at all (e.g. the handle from TA_GetHandle).
+#
+# TA_GetFeatureValue is the odd one out: called without a buffer it returns
+# the size of the buffer it needs instead of an HRESULT.
+
+TA_CHECKED, TA_STATUS, TA_VALUE = range(3)
+
+_uint32_p = POINTER(c_uint32)
+
+TA_FUNCTIONS = {
+    # name: (return handling, restype, argtypes)
+    "TA_Activate": (TA_CHECKED, c_int, [c_uint32, POINTER(ACTIVATE_OPTIONS)]),
+    "TA_ActivateFromFile": (TA_CHECKED, c_int, [c_uint32, wstr_type]),
+    "TA_ActivationRequestToFile": (TA_CHECKED, c_int, [c_uint32, wstr_type, POINTER(ACTIVATE_OPTIONS)]),
+    "TA_CheckAndSavePKey": (TA_STATUS, c_int, [c_uint32, wstr_type, c_uint32]),
+    "TA_Deactivate": (TA_CHECKED, c_int, [c_uint32, c_char]),
+    "TA_DeactivationRequestToFile": (TA_CHECKED, c_int, [c_uint32, wstr_type, c_char]),
+    "TA_ExtendTrial": (TA_CHECKED, c_int, [c_uint32, c_uint32, wstr_type]),
+    "TA_GenuineDays": (TA_CHECKED, c_int, [c_uint32, c_uint32, c_uint32, _uint32_p, POINTER(c_char)]),
+    "TA_GetExtraData": (TA_CHECKED, c_int, [c_uint32, wstr_type, c_int]),
+    "TA_GetFeatureValue": (TA_STATUS, c_int, [c_uint32, wstr_type, wstr_type, c_int]),
+    "TA_GetHandle": (TA_VALUE, c_uint32, [wstr_type]),
+    "TA_GetPKey": (TA_CHECKED, c_int, [c_uint32, wstr_type, c_int]),
+    "TA_GetVersion": (TA_CHECKED, c_int, [_uint32_p, _uint32_p, _uint32_p, _uint32_p]),
+    "TA_IsActivated": (TA_STATUS, c_int, [c_uint32]),
+    "TA_IsDateValid": (TA_CHECKED, c_int, [c_uint32, wstr_type, c_uint32]),
+    "TA_IsGenuine": (TA_STATUS, c_int, [c_uint32]),
+    "TA_IsGenuineEx": (TA_STATUS, c_int, [c_uint32, POINTER(GENUINE_OPTIONS)]),
+    "TA_IsProductKeyValid": (TA_CHECKED, c_int, [c_uint32]),
+    "TA_PDetsFromByteArray": (TA_CHECKED, c_int, [c_char_p, c_size_t]),
+    "TA_PDetsFromPath": (TA_CHECKED, c_int, [wstr_type]),
+    "TA_SetCustomActDataPath": (TA_CHECKED, c_int, [wstr_type]),
+    "TA_SetCustomProxy": (TA_CHECKED, c_int, [wstr_type]),
+    "TA_SetTrialCallback": (TA_CHECKED, c_int, [c_uint32, TrialCallback, c_void_p]),
+    "TA_TrialDaysRemaining": (TA_CHECKED, c_int, [c_uint32, c_uint32, _uint32_p]),
+    "TA_UseTrial": (TA_CHECKED, c_int, [c_uint32, c_uint32, wstr_type]),
+    "TA_UseTrialVerifiedFromFile": (TA_CHECKED, c_int, [c_uint32, wstr_type, c_uint32]),
+    "TA_UseTrialVerifiedRequest": (TA_CHECKED, c_int, [c_uint32, wstr_type, wstr_type]),
+}
+
+
+def bind_library(lib):
+    """Applies the signatures in TA_FUNCTIONS to a freshly loaded library."""
+    for name, (handling, restype, argtypes) in TA_FUNCTIONS.items():
+        try:
+            func = getattr(lib, name)
+        except AttributeError:
+            # not exported by this version of TurboActivate
+            continue
+
+        func.restype = restype
+        func.argtypes = argtypes
+
+        if handling == TA_CHECKED:
+            func.errcheck = _errcheck
+
+
+def _errcheck(return_code, func, args):
+    if return_code != TA_OK:
+        validate_result(return_code)
+
+    return return_code
+
+
 def validate_result(return_code):
     # All ok, no need to perform error handling.
     if return_code == TA_OK:
         return
 
-    # Raise an exception type appropriate for the kind of error
-    if return_code == TA_FAIL:
-        raise TurboActivateFailError()
-    elif return_code == TA_E_PDETS:
-        raise TurboActivateDatFileError()
-    elif return_code == TA_E_EDATA_LONG:
-        raise TurboActivateExtraDataLongError()
-    elif return_code == TA_E_PKEY:
-        raise TurboActivateProductKeyError()
-    elif return_code == TA_E_INUSE:
-        raise TurboActivateInUseError()
-    elif return_code == TA_E_REVOKED:
-        raise TurboActivateRevokedError()
-    elif return_code == TA_E_GUID:
-        raise TurboActivateGuidError()
-    elif return_code == TA_E_TRIAL:
-        raise TurboActivateTrialCorruptedError()
-    elif return_code == TA_E_TRIAL_EUSED:
-        raise TurboActivateTrialUsedError()
-    elif return_code == TA_E_TRIAL_EEXP:
-        raise TurboActivateTrialExpiredError()
-    elif return_code == TA_E_ACTIVATE:
-        raise TurboActivateNotActivatedError()
-    elif return_code == TA_E_INVALID_FLAGS:
-        raise TurboActivateFlagsError()
-    elif return_code == TA_E_COM:
-        raise TurboActivateComError()
-    elif return_code == TA_E_INET:
-        raise TurboActivateInetError()
-    elif return_code == TA_E_PERMISSION:
-        raise TurboActivatePermissionError()
-    elif return_code == TA_E_NO_MORE_DEACTIVATIONS:
-        raise TurboActivateNoMoreDeactivationsError()
-    elif return_code == TA_E_ACCOUNT_CANCELED:
-        raise TurboActivateAccountCanceledError()
-    elif return_code == TA_E_INVALID_HANDLE:
-        raise TurboActivateInvalidHandleError()
-    elif return_code == TA_E_ALREADY_ACTIVATED:
-        raise TurboActivateAlreadyActivatedError()
-    elif return_code == TA_E_ENABLE_NETWORK_ADAPTERS:
-        raise TurboActivateEnableNetworkAdaptersError()
-    elif return_code == TA_E_ALREADY_VERIFIED_TRIAL:
-        raise TurboActivateAlreadyVerifiedTrialError()
-    elif return_code == TA_E_TRIAL_EXPIRED:
-        raise TurboActivateTrialExpiredError()
-    elif return_code == TA_E_MUST_SPECIFY_TRIAL_TYPE:
-        raise TurboActivateMustSpecifyTrialTypeError()
-    elif return_code == TA_E_MUST_USE_TRIAL:
-        raise TurboActivateMustUseTrialError()
-    elif return_code == TA_E_NO_MORE_TRIALS_ALLOWED:
-        raise TurboActivateNoMoreTrialsError()
-    elif return_code == TA_E_INVALID_ARGS:
-        raise TurboActivateInvalidArgsError()
-    elif return_code == TA_E_BROKEN_WMI:
-        raise TurboActivateBrokenWMIError()
-    elif return_code == TA_E_INET_TIMEOUT:
-        raise TurboActivateInetTimeoutError()
-    elif return_code == TA_E_INET_TLS:
-        raise TurboActivateInetTLSError()
-
-    # Otherwise bail out and raise a generic exception
-    raise TurboActivateError(return_code)
+    # Raise an exception type appropriate for the kind of error, otherwise
+    # bail out and raise a generic exception
+    error = _ERRORS.get(return_code)
+
+    if error is None:
+        error = TurboActivateError(return_code)
+    else:
+        error = error()
+
+    error.return_code = return_code
+    raise error
 
 
 #
@@ -287,7 +351,9 @@ def validate_result(return_code):
 class TurboActivateError(Exception):
 
     """Generic TurboActivate error"""
-    pass
+
+    # The TA_* return code of the native call that failed (if any)
+    return_code = None
 
 
 class TurboActivateFailError(TurboActivateError):
@@ -321,6 +387,14 @@ class TurboActivateInetTimeoutError(TurboActivateInetError):
     pass
 
 
+class TurboActivateTimeoutError(TurboActivateInetTimeoutError):
+
+    """The call didn't finish within the timeout passed to it. The native call
+    can't be interrupted, so it goes on in the background."""
+
+    return_code = TA_E_INET_TIMEOUT
+
+
 class TurboActivateInetTLSError(TurboActivateInetError):
 
     """The secure connection to the activation servers failed due to a TLS or
@@ -328,6 +402,14 @@ class TurboActivateInetTLSError(TurboActivateInetError):
     pass
 
 
+class TurboActivateCircuitOpenError(TurboActivateInetError):
+
+    """The call wasn't made because the recent calls to the servers kept
+    failing (see turboactivate.retry.CircuitBreaker)."""
+
+    return_code = TA_E_INET
+
+
 class TurboActivateInUseError(TurboActivateError):
 
     """The product key has already been activated with the maximum number of computers."""
@@ -524,3 +606,38 @@ class TurboActivateInvalidArgsError(TurboActivateError):
     The arguments passed to the function are invalid. Double check your logic.
     """
     pass
+
+
+# Maps every known return code to the exception raised by validate_result().
+
+_ERRORS = {
+    TA_FAIL: TurboActivateFailError,
+    TA_E_PDETS: TurboActivateDatFileError,
+    TA_E_EDATA_LONG: TurboActivateExtraDataLongError,
+    TA_E_PKEY: TurboActivateProductKeyError,
+    TA_E_INUSE: TurboActivateInUseError,
+    TA_E_REVOKED: TurboActivateRevokedError,
+    TA_E_GUID: TurboActivateGuidError,
+    TA_E_TRIAL: TurboActivateTrialCorruptedError,
+    TA_E_TRIAL_EUSED: TurboActivateTrialUsedError,
+    TA_E_TRIAL_EEXP: TurboActivateTrialExpiredError,
+    TA_E_ACTIVATE: TurboActivateNotActivatedError,
+    TA_E_INVALID_FLAGS: TurboActivateFlagsError,
+    TA_E_COM: TurboActivateComError,
+    TA_E_INET: TurboActivateInetError,
+    TA_E_PERMISSION: TurboActivatePermissionError,
+    TA_E_NO_MORE_DEACTIVATIONS: TurboActivateNoMoreDeactivationsError,
+    TA_E_ACCOUNT_CANCELED: TurboActivateAccountCanceledError,
+    TA_E_INVALID_HANDLE: TurboActivateInvalidHandleError,
+    TA_E_ALREADY_ACTIVATED: TurboActivateAlreadyActivatedError,
+    TA_E_ENABLE_NETWORK_ADAPTERS: TurboActivateEnableNetworkAdaptersError,
+    TA_E_ALREADY_VERIFIED_TRIAL: TurboActivateAlreadyVerifiedTrialError,
+    TA_E_TRIAL_EXPIRED: TurboActivateTrialExpiredError,
+    TA_E_MUST_SPECIFY_TRIAL_TYPE: TurboActivateMustSpecifyTrialTypeError,
+    TA_E_MUST_USE_TRIAL: TurboActivateMustUseTrialError,
+    TA_E_NO_MORE_TRIALS_ALLOWED: TurboActivateNoMoreTrialsError,
+    TA_E_INVALID_ARGS: TurboActivateInvalidArgsError,
+    TA_E_BROKEN_WMI: TurboActivateBrokenWMIError,
+    TA_E_INET_TIMEOUT: TurboActivateInetTimeoutError,
+    TA_E_INET_TLS: TurboActivateInetTLSError,
+}
@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+import threading
+import time
+
+
+class ResultCache(object):
+    """
+    A small TTL cache for the results of the slow (possibly network bound)
+    TurboActivate calls.
+
+    Once an entry expires the stale value keeps being returned while a single
+    background thread fetches a fresh one ("stale-while-revalidate"). Only the
+    very first lookup of a key blocks on the native call.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._refreshing = set()
+        self._generation = 0
+
+    def _after_fork(self):
+        # the refresh threads weren't copied to the child
+        self._lock = threading.Lock()
+        self._refreshing = set()
+
+    def get(self, key, fetch):
+        """
+        Returns the cached value for key, calling fetch() to compute it when
+        there is no cached value yet.
+        """
+        entry = self._entries.get(key)
+
+        if entry is None:
+            generation = self._generation
+            value = fetch()
+            self._store(key, value, generation)
+
+            return value
+
+        value, expires = entry
+
+        if time.monotonic() >= expires:
+            self._refresh(key, fetch)
+
+        return value
+
+    def invalidate(self, key=None, value=None):
+        """
+        Drops every cached value. Refreshes already in flight are discarded.
+        With a key, value is cached for it in place of the old values: the
+        result of the call that found the old ones out of date.
+        """
+        with self._lock:
+            self._generation += 1
+            self._entries = {}
+
+            if key is not None:
+                self._entries[key] = (value, time.monotonic() + self.ttl)
+
+    def _store(self, key, value, generation):
+        with self._lock:
+            # don't let a fetch that started before invalidate() resurrect
+            # the old license state
+            if generation == self._generation:
+                self._entries[key] = (value, time.monotonic() + self.ttl)
+
+    def _refresh(self, key, fetch):
+        with self._lock:
+            if key in self._refreshing:
+                return
+
+            self._refreshing.add(key)
+            generation = self._generation
+
+        thread = threading.Thread(target=self._run_refresh,
+                                  args=(key, fetch, generation))
+        thread.daemon = True
+        thread.start()
+
+    def _run_refresh(self, key, fetch, generation):
+        try:
+            value = fetch()
+        except Exception:
+            # Keep serving the stale value for another ttl instead of
+            # retrying the failing call on every single read.
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._store(key, entry[0], generation)
+        else:
+            self._store(key, value, generation)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+# How far back the wall clock has to jump for ExpiryCache to notice (so the
+# races between threads reading the clock don't count as jumps).
+CLOCK_SLACK = 1.0
+
+
+class ExpiryCache(object):
+    """
+    A cache for answers that stay the same until a known moment of the wall
+    clock, like whether a date has passed. Each entry is kept until its
+    moment comes. If the wall clock jumps backwards the whole cache is
+    dropped, since answers about the "past" may not hold anymore.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._generation = 0
+        self._latest = time.time()
+
+    @property
+    def generation(self):
+        """Pass this to put() to not store a value computed before invalidate()."""
+        return self._generation
+
+    def _after_fork(self):
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the cached value for key, or None."""
+        now = time.time()
+
+        if now < self._latest - CLOCK_SLACK:
+            self.invalidate()
+
+        if now > self._latest:
+            self._latest = now
+
+        entry = self._entries.get(key)
+
+        if entry is None or now >= entry[1]:
+            return None
+
+        return entry[0]
+
+    def put(self, key, value, until, generation):
+        """
+        Caches value until the time.time() timestamp "until", unless the
+        cache was invalidated after generation was read.
+        """
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (value, until)
+
+    def invalidate(self):
+        """Drops every cached value."""
+        with self._lock:
+            self._generation += 1
+            self._entries = {}
+            self._latest = time.time()
+
+
+def utc_timestamp(date):
+    """
+    Returns the timestamp of a "YYYY-MM-DD HH:MM:SS" or "YYYY-MM-DD" UTC
+    date (the format of the TurboActivate dates), or None if it isn't one.
+    """
+    import calendar
+
+    for date_format in ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d"):
+        try:
+            return calendar.timegm(time.strptime(date, date_format))
+        except (TypeError, ValueError):
+            pass
+
+    return None
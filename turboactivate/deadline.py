@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+Runs native calls with a caller-side timeout.
+
+The native calls can't be interrupted, so a call with a timeout runs on a
+worker thread while the caller waits for it. If the timeout passes first
+the caller gets a TurboActivateTimeoutError, and the call is "abandoned":
+it finishes in the background and its result is thrown away. To keep
+threads from piling up while the servers are unreachable, at most
+max_abandoned calls can be abandoned at once; past that, calls with a
+timeout fail right away.
+
+The workers are daemon threads (unlike the concurrent.futures ones) so a
+call stuck in the native library never keeps the process from exiting.
+"""
+
+import queue
+import threading
+
+from turboactivate.c_wrapper import TurboActivateTimeoutError
+
+
+class _Call(object):
+
+    __slots__ = ("func", "args", "finished", "abandoned", "result", "error")
+
+    def __init__(self, func, args):
+        self.func = func
+        self.args = args
+        self.finished = threading.Event()
+        self.abandoned = False
+        self.result = None
+        self.error = None
+
+
+class CallRunner(object):
+
+    def __init__(self, max_abandoned=16, idle_timeout=60):
+        """
+        At most max_abandoned calls can be abandoned at once. Idle workers
+        exit after idle_timeout seconds.
+        """
+        self.max_abandoned = max_abandoned
+        self.idle_timeout = idle_timeout
+
+        self._lock = threading.Lock()
+        self._calls = queue.Queue()
+
+        # workers waiting for a call and not claimed by a caller yet
+        self._idle = 0
+
+        # calls abandoned by their caller and still running
+        self._abandoned = 0
+
+    def _after_fork(self):
+        # None of the workers (idle or running an abandoned call) were copied
+        # to the child, so start over with no workers at all.
+        self._lock = threading.Lock()
+        self._calls = queue.Queue()
+        self._idle = 0
+        self._abandoned = 0
+
+    @property
+    def abandoned(self):
+        """The number of abandoned calls still running."""
+        return self._abandoned
+
+    def call(self, timeout, func, *args):
+        """
+        Returns func(*args), or raises TurboActivateTimeoutError if it takes
+        longer than timeout seconds. None waits forever, on the calling
+        thread.
+        """
+        if timeout is None:
+            return func(*args)
+
+        return self.wait(self.start(func, *args), timeout)
+
+    def start(self, func, *args):
+        """
+        Starts func(*args) on a worker and returns the call to pass to
+        wait(). Raises TurboActivateTimeoutError (without starting anything)
+        while max_abandoned calls are abandoned.
+        """
+        call = _Call(func, args)
+
+        with self._lock:
+            if self._abandoned >= self.max_abandoned:
+                raise TurboActivateTimeoutError(
+                    "%d calls already timed out and are still running" % self._abandoned)
+
+            if self._idle:
+                self._idle -= 1
+            else:
+                worker = threading.Thread(target=self._work, name="turboactivate-call")
+                worker.daemon = True
+                worker.start()
+
+            self._calls.put(call)
+
+        return call
+
+    def wait(self, call, timeout):
+        """
+        Returns the result of a call from start(), or raises
+        TurboActivateTimeoutError (abandoning the call) if it doesn't finish
+        within timeout seconds.
+        """
+        if not call.finished.wait(timeout):
+            with self._lock:
+                if not call.finished.is_set():
+                    call.abandoned = True
+                    self._abandoned += 1
+
+            if call.abandoned:
+                raise TurboActivateTimeoutError("the call didn't finish in %g seconds" % timeout)
+
+        if call.error is not None:
+            raise call.error
+
+        return call.result
+
+    def _work(self):
+        while True:
+            try:
+                call = self._calls.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    # a caller claimed this worker just before the timeout
+                    if not self._calls.empty():
+                        continue
+
+                    self._idle -= 1
+                    return
+
+            try:
+                call.result = call.func(*call.args)
+            except BaseException as e:
+                call.error = e
+
+            with self._lock:
+                call.finished.set()
+
+                if call.abandoned:
+                    self._abandoned -= 1
+
+                self._idle += 1
+
+            # don't keep the result alive until the next call
+            call = None
+
+
+# The process-wide runner used by the TurboActivate objects
+runner = CallRunner()
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+Fans the trial expiration callback out to any number of subscribers.
+
+TurboActivate calls the trial callback on its own background thread. One
+TrialEvents object per handle registers a single native callback, which only
+queues the status and returns. A dispatcher thread then delivers each status
+to the subscribers:
+
+    events = ta.trial_events
+
+    events.subscribe(on_trial_expired)             # on_trial_expired(status), on a worker thread
+    events.subscribe_queue(status_queue)            # status_queue.put_nowait(status)
+    events.subscribe_asyncio(loop, on_trial_expired) # loop.call_soon_threadsafe(on_trial_expired, status)
+
+The same status reported again within coalesce_window seconds is delivered
+only once.
+"""
+
+import queue
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from ctypes import c_void_p
+
+from turboactivate.c_wrapper import TrialCallback
+
+
+# tells a dispatcher thread that its TrialEvents is gone
+_STOP = object()
+
+
+class TrialEvents(object):
+
+    def __init__(self, lib, handle, coalesce_window=1.0, max_workers=2, expiry=None):
+        """
+        expiry is the handle's ExpiryCache, cleared by every event (the
+        cached trial days and dates may not hold anymore).
+        """
+        self._lib = lib
+        self._handle = handle
+
+        self.coalesce_window = coalesce_window
+        self._expiry = expiry
+
+        # The native callback. It must stay alive as long as TurboActivate
+        # might call it, which is as long as this object.
+        self._native_callback = TrialCallback(self._on_native_event)
+
+        self._lock = threading.Lock()
+        self._registered = False
+
+        # (key, deliver) pairs, replaced (never modified) on (un)subscribe
+        self._subscribers = ()
+
+        # the callback passed to TurboActivate.use_trial()
+        self._callback = None
+
+        self._events = queue.Queue()
+        self._thread = None
+        self._executor = None
+        self._max_workers = max_workers
+
+        self._last_status = None
+        self._last_time = 0
+
+    def register(self):
+        """Registers the native callback with TurboActivate (only the first call does anything)."""
+        with self._lock:
+            if self._registered:
+                return
+
+            self._lib.TA_SetTrialCallback(self._handle, self._native_callback, c_void_p(0))
+            self._registered = True
+
+            # The dispatcher only holds a weak reference, so this object (and
+            # the library or backend it holds) can still go away, stopping it.
+            self._thread = threading.Thread(target=_dispatch, args=(weakref.ref(self), self._events),
+                                            name="turboactivate-trial-events")
+            self._thread.daemon = True
+            self._thread.start()
+
+            weakref.finalize(self, self._events.put, _STOP)
+
+    def _after_fork(self):
+        # TurboActivate's threads, the dispatcher, and the callback workers
+        # weren't copied to the child, and the subscribers belong to the
+        # parent. Start over unregistered: the child's first subscription
+        # registers the native callback (and starts a dispatcher) again.
+        self._lock = threading.Lock()
+        self._registered = False
+        self._subscribers = ()
+        self._callback = None
+        self._events = queue.Queue()
+        self._thread = None
+        self._executor = None
+
+    def subscribe(self, callback, *args):
+        """
+        Calls callback(status, *args) on a worker thread for each event.
+        Subscribing the same callback and arguments twice has no effect.
+        """
+        return self._subscribe((callback, args), lambda status: self._submit(callback, status, args))
+
+    def subscribe_queue(self, events_queue):
+        """Puts each status in events_queue (a queue.Queue). Events that don't fit are dropped."""
+        return self._subscribe(events_queue, lambda status: self._put(events_queue, status))
+
+    def subscribe_asyncio(self, loop, callback):
+        """
+        Calls callback(status) on the asyncio event loop "loop". To get the
+        events from an asyncio.Queue, use its put_nowait method as callback.
+        """
+        return self._subscribe((loop, callback), lambda status: loop.call_soon_threadsafe(callback, status))
+
+    def unsubscribe(self, key):
+        """Removes the subscriber, given the key returned by the subscribe function."""
+        with self._lock:
+            self._subscribers = tuple(s for s in self._subscribers if s[0] != key)
+
+    def set_callback(self, callback):
+        """
+        Sets the callback passed to TurboActivate.use_trial(), replacing the
+        previous one. It's called as callback(status, None) on a worker thread.
+        """
+        self._callback = callback
+        self.register()
+
+    def _subscribe(self, key, deliver):
+        with self._lock:
+            if all(s[0] != key for s in self._subscribers):
+                self._subscribers = self._subscribers + ((key, deliver),)
+
+        self.register()
+
+        return key
+
+    def _on_native_event(self, status, unused):
+        # runs on TurboActivate's thread: don't do anything that can block
+        self._events.put(status)
+
+    def _deliver(self, status):
+        if self._expiry is not None:
+            self._expiry.invalidate()
+
+        now = time.monotonic()
+
+        if status == self._last_status and now - self._last_time < self.coalesce_window:
+            return
+
+        self._last_status = status
+        self._last_time = now
+
+        callback = self._callback
+
+        if callback is not None:
+            self._submit(callback, status, (None,))
+
+        for _, deliver in self._subscribers:
+            try:
+                deliver(status)
+            except Exception:
+                # e.g. the asyncio loop of a subscriber has been closed,
+                # that mustn't stop the delivery to everyone else
+                pass
+
+    def _submit(self, callback, status, args):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                thread_name_prefix="turboactivate-trial-callback")
+
+        self._executor.submit(callback, status, *args)
+
+    @staticmethod
+    def _put(events_queue, status):
+        try:
+            events_queue.put_nowait(status)
+        except queue.Full:
+            pass
+
+
+def _dispatch(events_ref, events_queue):
+    while True:
+        status = events_queue.get()
+        events = events_ref()
+
+        if status is _STOP or events is None:
+            return
+
+        events._deliver(status)
+        events = None
@@ -0,0 +1,683 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+A pure Python stand-in for the TurboActivate library, to test and load test
+the licensing code paths offline, without a TurboActivate.dat file, a
+product key, or real hardware:
+
+    from turboactivate.fake import FakeTurboActivate, NETWORK_FUNCTIONS, lognormal
+
+    fake = FakeTurboActivate(
+        product_keys={"AAAA-BBBB-CCCC-DDDD-EEEE-FFFF-GGGG": {"seats": "10"}},
+        latency=dict.fromkeys(NETWORK_FUNCTIONS, lognormal(0.08, 0.5)),
+        failures={"TA_IsGenuineEx": (0.02, TA_E_INET)},
+        seed=1)
+
+    ta = TurboActivate(guid, backend=fake)
+
+The fake keeps the state of each product (version GUID) in memory: the
+saved product key, the activation with its extra data and features, the
+verified and unverified trials, and the trial callback. Each function
+answers with the same TA_* codes as the library would.
+
+latency maps function names to the seconds each call takes: a number, a
+(low, high) tuple for a uniform distribution, or a function that takes a
+random.Random and returns the seconds (see lognormal() and exponential()).
+failures maps function names to a (rate, return code) tuple, or a list of
+them: each call fails with that return code with that probability, before
+touching the state.
+
+The offline activation files are JSON. activate_from_file() accepts the
+files written by activation_request_to_file(), as if the LimeLM server had
+answered them.
+"""
+
+import itertools
+import json
+import random
+import threading
+import time
+
+from turboactivate.backend import PythonBackend
+from turboactivate.c_wrapper import *
+
+
+# The functions that make the library contact the LimeLM servers
+NETWORK_FUNCTIONS = (
+    "TA_Activate",
+    "TA_Deactivate",
+    "TA_ExtendTrial",
+    "TA_IsGenuine",
+    "TA_IsGenuineEx",
+    "TA_UseTrial",
+)
+
+# A trial day, in seconds
+DAY = 24 * 60 * 60
+
+# The handles of every fake in the process, so they're told apart (like the
+# GUIDs in traces) even with one fake per test
+_handles = itertools.count(1)
+
+
+def lognormal(median, sigma):
+    """A log-normal latency distribution (typical of network calls)."""
+    import math
+
+    mu = math.log(median)
+
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+def exponential(mean):
+    """An exponential latency distribution."""
+    return lambda rng: rng.expovariate(1.0 / mean)
+
+
+class _Product(object):
+
+    """The state of one version GUID."""
+
+    def __init__(self, guid, handle):
+        self.guid = guid
+        self.handle = handle
+        self.product_key = None
+        self.activated = False
+        self.extra_data = ""
+        self.features = {}
+        self.features_changed = False
+
+        # trial flag (TA_VERIFIED_TRIAL or TA_UNVERIFIED_TRIAL) -> start time
+        self.trials = {}
+        self.trial_extension = 0
+        self.trial_expired = False
+        self.used_extensions = set()
+
+        self.callback = None
+        self.user_data = None
+
+
+class FakeTurboActivate(PythonBackend):
+
+    def __init__(self, product_keys=("AAAA-BBBB-CCCC-DDDD-EEEE-FFFF-GGGG",), features=None,
+                 revoked_keys=(), trial_days=30, trial_extensions=None, guids=None,
+                 latency=None, failures=None, seed=None, version=(4, 4, 4, 1)):
+        """
+        product_keys - the valid product keys: a list, or a dict of {product
+                       key: {feature name: value}}
+        features     - the features of the product keys given as a list
+        revoked_keys - product keys that fail to activate with TA_E_REVOKED
+        trial_days   - the length of the trials
+        trial_extensions - dict of {extension code: days}
+        guids        - the version GUIDs TA_GetHandle() knows (None for all)
+        latency, failures - see the module documentation
+        seed         - the seed of the latency and failure random numbers
+        version      - what TA_GetVersion() returns
+        """
+        if not isinstance(product_keys, dict):
+            product_keys = dict((key, features or {}) for key in product_keys)
+
+        self.product_keys = product_keys
+        self.revoked_keys = set(revoked_keys)
+        self.trial_days = trial_days
+        self.trial_extensions = dict(trial_extensions or {})
+        self.guids = None if guids is None else set(guids)
+        self.version = version
+
+        # the number of calls of each function
+        self.calls = {}
+
+        self._lock = threading.RLock()
+        self._random = random.Random(seed)
+        self._products = {}
+
+        # handle -> _Product
+        self._handles = {}
+        self._clock_offset = 0
+
+        for name in TA_FUNCTIONS:
+            method = getattr(self, name, None)
+
+            if method is not None:
+                setattr(self, name, self._simulated(name, method,
+                                                    (latency or {}).get(name),
+                                                    (failures or {}).get(name)))
+
+        PythonBackend.__init__(self)
+
+    #
+    # Test helpers
+    #
+
+    def time(self):
+        """The current time of the fake (time.time() moved by advance())."""
+        return time.time() + self._clock_offset
+
+    def advance(self, seconds):
+        """Moves the fake's clock forward, to expire trials without waiting."""
+        with self._lock:
+            self._clock_offset += seconds
+
+    def set_features(self, guid, features):
+        """
+        Changes the features of the activated product, as if they were
+        changed in LimeLM. The next genuine check returns TA_E_FEATURES_CHANGED.
+        """
+        with self._lock:
+            product = self._product(guid)
+            product.features = dict(features)
+            product.features_changed = True
+
+    def revoke(self, product_key):
+        """Revokes a product key: the next genuine checks fail with TA_E_REVOKED."""
+        with self._lock:
+            self.revoked_keys.add(product_key)
+
+    def expire_trial(self, guid, fraud=False):
+        """Ends the trial of the product, calling its trial callback."""
+        with self._lock:
+            product = self._product(guid)
+            product.trial_expired = True
+
+        self._fire(product, TA_CB_EXPIRED_FRAUD if fraud else TA_CB_EXPIRED)
+
+    #
+    # The TurboActivate functions
+    #
+
+    def TA_PDetsFromPath(self, path):
+        return TA_OK
+
+    def TA_PDetsFromByteArray(self, data, length):
+        return TA_OK
+
+    def TA_GetHandle(self, guid):
+        guid = _text(guid)
+
+        if self.guids is not None and guid not in self.guids:
+            return 0
+
+        with self._lock:
+            return self._product(guid).handle
+
+    def TA_CheckAndSavePKey(self, handle, product_key, flags):
+        product = self._get(handle)
+        product_key = _text(product_key)
+
+        if product is None:
+            return TA_E_INVALID_HANDLE
+
+        if product_key not in self.product_keys:
+            return TA_FAIL
+
+        if product.activated and product.product_key != product_key:
+            return TA_E_ALREADY_ACTIVATED
+
+        product.product_key = product_key
+
+        return TA_OK
+
+    def TA_IsProductKeyValid(self, handle):
+        product = self._get(handle)
+
+        if product is None:
+            return TA_E_INVALID_HANDLE
+
+        return TA_OK if product.product_key in self.product_keys else TA_E_PKEY
+
+    def TA_GetPKey(self, handle, buf, size):
+        product = self._get(handle)
+
+        if product is None:
+            return TA_E_INVALID_HANDLE
+
+        if product.product_key is None:
+            return TA_E_PKEY
+
+        return _copy_out(product.product_key, buf, size)
+
+    def TA_Activate(self, handle, options):
+        return self._activate(handle, _extra_data(options))
+
+    def TA_ActivationRequestToFile(self, handle, filename, options):
+        product = self._get(handle)
+
+        if product is None:
+            return TA_E_INVALID_HANDLE
+
+        if product.product_key is None:
+            return TA_E_PKEY
+
+        return _write_json(filename, {"guid": product.guid,
+                                      "product_key": product.product_key,
+                                      "extra_data": _extra_data(options)})
+
+    def TA_ActivateFromFile(self, handle, filename):
+        product = self._get(handle)
+        request = _read_json(filename)
+
+        if product is None:
+            return TA_E_INVALID_HANDLE
+
+        if request is None or request.get("guid") != product.guid:
+            return TA_FAIL
+
+        if type(self).TA_CheckAndSavePKey(self, handle, request.get("product_key"), 0) != TA_OK:
+            return TA_E_PKEY
+
+        return self._activate(handle, request.get("extra_data", ""))
+
+    def TA_Deactivate(self, handle, erase_product_key):
+        with self._lock:
+            product = self._get(handle)
+
+            if product is None:
+                return TA_E_INVALID_HANDLE
+
+            if not product.activated:
+                return TA_E_ACTIVATE
+
+            product.activated = False
+            product.extra_data = ""
+            product.features = {}
+
+            if erase_product_key:
+                product.product_key = None
+
+        return TA_OK
+
+    def TA_DeactivationRequestToFile(self, handle, filename, erase_product_key):
+        product = self._get(handle)
+
+        if product is None:
+            return TA_E_INVALID_HANDLE
+
+        if not product.activated:
+            return TA_E_ACTIVATE
+
+        return_code = _write_json(filename, {"guid": product.guid,
+                                             "product_key": product.product_key,
+                                             "deactivate": True})
+
+        if return_code != TA_OK:
+            return return_code
+
+        return type(self).TA_Deactivate(self, handle, erase_product_key)
+
+    def TA_IsActivated(self, handle):
+        product = self._get(handle)
+
+        if product is None:
+            return TA_E_INVALID_HANDLE
+
+        return TA_OK if product.activated else TA_FAIL
+
+    def TA_IsGenuine(self, handle):
+        return self._is_genuine(handle)
+
+    def TA_IsGenuineEx(self, handle, options):
+        return self._is_genuine(handle)
+
+    def TA_GenuineDays(self, handle, days_between_checks, grace_days, days_remaining, in_grace_period):
+        product = self._get(handle)
+
+        if product is None:
+            return TA_E_INVALID_HANDLE
+
+        if not product.activated:
+            return TA_E_ACTIVATE
+
+        days_remaining.contents.value = days_between_checks
+        in_grace_period.contents.value = b"\0"
+
+        return TA_OK
+
+    def TA_GetExtraData(self, handle, buf, size):
+        product = self._get(handle)
+
+        if product is None:
+            return TA_E_INVALID_HANDLE
+
+        if not product.extra_data:
+            return TA_FAIL
+
+        return _copy_out(product.extra_data, buf, size)
+
+    def TA_GetFeatureValue(self, handle, name, buf, size):
+        product = self._get(handle)
+
+        if product is None:
+            return TA_E_INVALID_HANDLE
+
+        value = product.features.get(_text(name))
+
+        if value is None:
+            return 0 if buf is None else TA_FAIL
+
+        return _copy_out(value, buf, size)
+
+    def TA_IsDateValid(self, handle, date, flags):
+        if flags != TA_HAS_NOT_EXPIRED:
+            return TA_E_INVALID_FLAGS
+
+        from turboactivate.cache import utc_timestamp
+
+        timestamp = utc_timestamp(_text(date))
+
+        if timestamp is None:
+            return TA_FAIL
+
+        return TA_OK if timestamp > self.time() else TA_E_EXPIRED
+
+    def TA_UseTrial(self, handle, flags, extra_data):
+        trial = _trial_type(flags)
+
+        if trial is None:
+            return TA_E_MUST_SPECIFY_TRIAL_TYPE
+
+        with self._lock:
+            product = self._get(handle)
+
+            if product is None:
+                return TA_E_INVALID_HANDLE
+
+            if trial == TA_UNVERIFIED_TRIAL and TA_VERIFIED_TRIAL in product.trials:
+                return TA_E_ALREADY_VERIFIED_TRIAL
+
+            product.trials.setdefault(trial, self.time())
+
+        if self._trial_seconds_left(product, trial) <= 0:
+            self._expired(product)
+
+            return TA_E_TRIAL_EXPIRED
+
+        return TA_OK
+
+    def TA_UseTrialVerifiedRequest(self, handle, filename, extra_data):
+        product = self._get(handle)
+
+        if product is None:
+            return TA_E_INVALID_HANDLE
+
+        return _write_json(filename, {"guid": product.guid, "trial": True,
+                                      "extra_data": _text(extra_data) or ""})
+
+    def TA_UseTrialVerifiedFromFile(self, handle, filename, flags):
+        request = _read_json(filename)
+
+        if request is None or not request.get("trial"):
+            return TA_FAIL
+
+        return type(self).TA_UseTrial(self, handle, flags, None)
+
+    def TA_TrialDaysRemaining(self, handle, flags, days):
+        trial = _trial_type(flags)
+
+        if trial is None:
+            return TA_E_MUST_SPECIFY_TRIAL_TYPE
+
+        product = self._get(handle)
+
+        if product is None:
+            return TA_E_INVALID_HANDLE
+
+        if trial not in product.trials:
+            return TA_E_MUST_USE_TRIAL
+
+        left = self._trial_seconds_left(product, trial)
+
+        if left <= 0:
+            self._expired(product)
+
+        days.contents.value = max(0, int(-(-left // DAY)))
+
+        return TA_OK
+
+    def TA_ExtendTrial(self, handle, flags, extension_code):
+        if _trial_type(flags) is None:
+            return TA_E_MUST_SPECIFY_TRIAL_TYPE
+
+        extension_code = _text(extension_code)
+
+        with self._lock:
+            product = self._get(handle)
+
+            if product is None:
+                return TA_E_INVALID_HANDLE
+
+            if extension_code in product.used_extensions:
+                return TA_E_TRIAL_EUSED
+
+            days = self.trial_extensions.get(extension_code)
+
+            if days is None:
+                return TA_FAIL
+
+            product.used_extensions.add(extension_code)
+            product.trial_extension += days * DAY
+            product.trial_expired = False
+
+        return TA_OK
+
+    def TA_SetTrialCallback(self, handle, callback, user_data):
+        product = self._get(handle)
+
+        if product is None:
+            return TA_E_INVALID_HANDLE
+
+        product.callback = callback
+        product.user_data = user_data
+
+        return TA_OK
+
+    def TA_SetCustomActDataPath(self, path):
+        return TA_OK
+
+    def TA_SetCustomProxy(self, address):
+        return TA_OK
+
+    def TA_GetVersion(self, major, minor, build, revision):
+        for pointer, value in zip((major, minor, build, revision), self.version):
+            pointer.contents.value = value
+
+        return TA_OK
+
+    #
+    # Internals
+    #
+    # The TA_* attributes of the instance are wrapped (see _simulated() and
+    # PythonBackend), so the functions call each other through the class.
+
+    def _product(self, guid):
+        product = self._products.get(guid)
+
+        if product is None:
+            product = _Product(guid, next(_handles))
+            self._products[guid] = self._handles[product.handle] = product
+
+        return product
+
+    def _get(self, handle):
+        return self._handles.get(handle)
+
+    def _activate(self, handle, extra_data):
+        with self._lock:
+            product = self._get(handle)
+
+            if product is None:
+                return TA_E_INVALID_HANDLE
+
+            if product.product_key not in self.product_keys:
+                return TA_E_PKEY
+
+            if product.product_key in self.revoked_keys:
+                return TA_E_REVOKED
+
+            if len(extra_data) > 255:
+                return TA_E_EDATA_LONG
+
+            product.activated = True
+            product.extra_data = extra_data
+            product.features = dict(self.product_keys[product.product_key])
+            product.features_changed = False
+
+        return TA_OK
+
+    def _is_genuine(self, handle):
+        with self._lock:
+            product = self._get(handle)
+
+            if product is None:
+                return TA_E_INVALID_HANDLE
+
+            if not product.activated:
+                return TA_E_ACTIVATE
+
+            if product.product_key in self.revoked_keys:
+                # deactivated, like by TA_Deactivate()
+                product.activated = False
+                product.features = {}
+                return TA_E_REVOKED
+
+            if product.features_changed:
+                product.features_changed = False
+                return TA_E_FEATURES_CHANGED
+
+        return TA_OK
+
+    def _trial_seconds_left(self, product, trial):
+        if product.trial_expired:
+            return 0
+
+        return (product.trials[trial] + self.trial_days * DAY + product.trial_extension) - self.time()
+
+    def _expired(self, product):
+        # the callback is only called once per expiration
+        with self._lock:
+            if product.trial_expired:
+                return
+
+            product.trial_expired = True
+
+        self._fire(product, TA_CB_EXPIRED)
+
+    def _fire(self, product, status):
+        callback = product.callback
+
+        if callback is not None:
+            # the library calls it from one of its own threads
+            thread = threading.Thread(target=callback, args=(status, product.user_data))
+            thread.daemon = True
+            thread.start()
+
+    def _simulated(self, name, method, latency, failures):
+        # Wraps a TA_* method to count the calls, sleep for the latency, and
+        # fail at the given rate.
+        if isinstance(latency, tuple):
+            low, high = latency
+            latency = lambda rng: rng.uniform(low, high)
+        elif latency is not None and not callable(latency):
+            latency = (lambda seconds: lambda rng: seconds)(latency)
+
+        if isinstance(failures, tuple):
+            failures = [failures]
+
+        def simulated(*args):
+            with self._lock:
+                self.calls[name] = self.calls.get(name, 0) + 1
+                delay = latency(self._random) if latency is not None else 0
+                chance = self._random.random() if failures else 1
+
+            if delay > 0:
+                time.sleep(delay)
+
+            for rate, return_code in failures or ():
+                if chance < rate:
+                    return return_code
+
+                chance -= rate
+
+            return method(*args)
+
+        simulated.__name__ = name
+
+        return simulated
+
+
+def _text(value):
+    # the text of a wstr, or a plain string
+    value = getattr(value, "value", value)
+
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def _copy_out(text, buf, size):
+    # Writes text to an output buffer like the library does. Without a buffer
+    # returns the size of the buffer needed (in characters).
+    value = text if is_win else text.encode("utf-8")
+
+    if buf is None or size == 0:
+        return len(value) + 1
+
+    if size < len(value) + 1:
+        return TA_E_INSUFFICIENT_BUFFER
+
+    buf.value = value
+
+    return TA_OK
+
+
+def _extra_data(options):
+    if options is None:
+        return ""
+
+    return _text(options.contents.sExtraData) or ""
+
+
+def _trial_type(flags):
+    trial = flags & (TA_VERIFIED_TRIAL | TA_UNVERIFIED_TRIAL)
+
+    if trial in (TA_VERIFIED_TRIAL, TA_UNVERIFIED_TRIAL):
+        return trial
+
+    return None
+
+
+def _write_json(filename, data):
+    try:
+        with open(_text(filename), "w") as f:
+            json.dump(data, f)
+    except (IOError, OSError):
+        return TA_E_PERMISSION
+
+    return TA_OK
+
+
+def _read_json(filename):
+    try:
+        with open(_text(filename)) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
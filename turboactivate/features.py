@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+Typed feature values:
+
+    import datetime, json
+
+    ta = TurboActivate("18324776654b3946fc44a5f3.49025204",
+                       feature_schema={"seats": int,
+                                       "pro": bool,
+                                       "expires": datetime.date,
+                                       "limits": json})
+
+    if ta.features.seats > 10:
+        ...
+
+ta.features is an immutable snapshot with one attribute per feature. The
+values are decoded (as UTF-8 text on every platform) and parsed once per
+license state, so reading them again is a plain attribute lookup.
+
+The types are int, float, bool ("1", "true", "yes", or "on", any case, are
+True; "0", "false", "no", "off" are False), str, datetime.date
+("YYYY-MM-DD"), datetime.datetime ("YYYY-MM-DD HH:MM:SS" or a date), the
+json module (parsed with json.loads()), or any function that takes the
+text and returns the value. Features without a value are None.
+"""
+
+import datetime
+import json
+
+
+class FeatureValueError(ValueError):
+
+    """A feature value doesn't match the type in the schema."""
+
+    def __init__(self, name, value, error):
+        ValueError.__init__(self, "feature %r: can't parse %r (%s)" % (name, value, error))
+
+        self.name = name
+        self.value = value
+
+
+def _parse_bool(text):
+    value = text.strip().lower()
+
+    if value in ("1", "true", "yes", "on"):
+        return True
+
+    if value in ("0", "false", "no", "off"):
+        return False
+
+    raise ValueError("not a boolean")
+
+
+def _parse_date(text):
+    return datetime.datetime.strptime(text.strip()[:10], "%Y-%m-%d").date()
+
+
+def _parse_datetime(text):
+    text = text.strip()
+
+    if len(text) == 10:
+        return datetime.datetime.strptime(text, "%Y-%m-%d")
+
+    return datetime.datetime.strptime(text.replace("T", " "), "%Y-%m-%d %H:%M:%S")
+
+
+def _parse_str(text):
+    return text
+
+
+_PARSERS = {
+    bool: _parse_bool,
+    datetime.date: _parse_date,
+    datetime.datetime: _parse_datetime,
+    float: float,
+    int: int,
+    json: json.loads,
+    str: _parse_str,
+}
+
+
+class FeatureSnapshot(object):
+
+    """The base class of the typed, immutable feature snapshots."""
+
+    __slots__ = ()
+
+    def __init__(self, values):
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("feature snapshots are read-only")
+
+    def as_dict(self):
+        """Returns the values as a dict keyed by feature name."""
+        return dict((name, getattr(self, name)) for name in self.__slots__)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.as_dict() == other.as_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "FeatureSnapshot(%s)" % ", ".join(
+            "%s=%r" % (name, getattr(self, name)) for name in self.__slots__)
+
+
+class FeatureSchema(object):
+
+    def __init__(self, types):
+        """
+        types is a dict of {feature name: type}. Feature names have to be
+        valid Python identifiers, as they're the snapshot's attributes.
+        """
+        self.parsers = {}
+
+        for name, kind in types.items():
+            if not name.isidentifier() or name.startswith("_") or name == "as_dict":
+                raise ValueError("feature name %r can't be used as an attribute" % (name,))
+
+            parser = _PARSERS.get(kind, kind)
+
+            if not callable(parser):
+                raise TypeError("feature %r: unsupported type %r" % (name, kind))
+
+            self.parsers[name] = parser
+
+        self.snapshot_type = type("FeatureSnapshot", (FeatureSnapshot,),
+                                  {"__slots__": tuple(sorted(self.parsers))})
+
+    def __reduce__(self):
+        # the snapshot type can't be pickled, but it's rebuilt from the parsers
+        return (FeatureSchema, (self.parsers,))
+
+    def load(self, get_value):
+        """
+        Returns a snapshot of the features, reading the raw value (bytes or
+        str) of each one with get_value(name). Raises FeatureValueError if a
+        value can't be parsed.
+        """
+        values = {}
+
+        for name, parser in self.parsers.items():
+            raw = get_value(name)
+            text = raw.decode("utf-8") if isinstance(raw, bytes) else raw
+
+            if not text:
+                values[name] = None
+                continue
+
+            try:
+                values[name] = parser(text)
+            except (TypeError, ValueError) as e:
+                raise FeatureValueError(name, text, e)
+
+        return self.snapshot_type(values)
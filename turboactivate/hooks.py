@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+Hooks for observing every native TurboActivate call.
+
+An observer is any callable taking (name, args, start, duration, return_code):
+the name of the TA_* function, the arguments it was called with, the
+time.perf_counter() value when it started, how long it took in seconds, and
+the TA_* return code (TA_OK for functions that don't return one).
+
+While no observer is installed the libraries are left untouched, so
+observing costs nothing when it's not used.
+"""
+
+import threading
+import time
+import weakref
+
+from turboactivate.c_wrapper import (
+    TurboActivateError,
+    TA_FUNCTIONS,
+    TA_OK,
+    TA_STATUS,
+)
+
+
+_lock = threading.Lock()
+
+# every library (and backend) used through the registry, as long as it's alive
+_libraries = weakref.WeakSet()
+
+# the installed observers, replaced (never modified) when one is added or removed
+_observers = ()
+
+
+class _ObservedFunction(object):
+
+    """Wraps a native function to report each call to the observers."""
+
+    __slots__ = ("name", "func", "returns_status")
+
+    def __init__(self, name, func, handling):
+        self.name = name
+        self.func = func
+        self.returns_status = handling == TA_STATUS
+
+    def __call__(self, *args):
+        start = time.perf_counter()
+
+        try:
+            result = self.func(*args)
+        except TurboActivateError as e:
+            _notify(self.name, args, start, time.perf_counter() - start, e.return_code)
+            raise
+
+        duration = time.perf_counter() - start
+
+        # TA_GetFeatureValue returns a size when called without a buffer
+        if self.returns_status and not (self.name == "TA_GetFeatureValue" and args[2] is None):
+            _notify(self.name, args, start, duration, result)
+        else:
+            _notify(self.name, args, start, duration, TA_OK)
+
+        return result
+
+
+def _notify(name, args, start, duration, return_code):
+    for observer in _observers:
+        observer(name, args, start, duration, return_code)
+
+
+def _instrument(lib):
+    for name, (handling, _, _) in TA_FUNCTIONS.items():
+        func = getattr(lib, name, None)
+
+        if func is not None and not isinstance(func, _ObservedFunction):
+            setattr(lib, name, _ObservedFunction(name, func, handling))
+
+
+def _uninstrument(lib):
+    for name in TA_FUNCTIONS:
+        func = getattr(lib, name, None)
+
+        if isinstance(func, _ObservedFunction):
+            setattr(lib, name, func.func)
+
+
+def track(lib):
+    """Observes the calls to a newly loaded (and bound) library."""
+    with _lock:
+        _libraries.add(lib)
+
+        if _observers:
+            _instrument(lib)
+
+
+def add_observer(observer):
+    """Starts reporting every native call to observer."""
+    global _observers
+
+    with _lock:
+        if observer in _observers:
+            return
+
+        if not _observers:
+            for lib in _libraries:
+                _instrument(lib)
+
+        _observers = _observers + (observer,)
+
+
+def _after_fork():
+    # called in the child after os.fork() (see turboactivate.registry)
+    global _lock
+
+    _lock = threading.Lock()
+
+    for observer in _observers:
+        after_fork = getattr(observer, "_after_fork", None)
+
+        if after_fork is not None:
+            after_fork()
+
+
+def remove_observer(observer):
+    """Stops reporting native calls to observer."""
+    global _observers
+
+    with _lock:
+        _observers = tuple(o for o in _observers if o is not observer)
+
+        if not _observers:
+            for lib in _libraries:
+                _uninstrument(lib)
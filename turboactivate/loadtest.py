@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+Load test driver: runs a mix of TurboActivate calls on N threads in each of
+M processes, and reports the throughput and latency percentiles for each
+thread count, to find where the wrapper stops scaling:
+
+    python -m turboactivate.loadtest
+    python -m turboactivate.loadtest --mix get_feature_value=90,is_activated=9,is_genuine_ex=1 \\
+        --threads 1,2,4,8,16,32,64 --processes 4 --duration 10
+
+By default the calls go to the in-process fake (turboactivate.fake) with an
+activated product key, so no network, license, or TurboActivate.dat is
+needed; --network-latency-ms and --failure-rate make its network calls
+slow and unreliable. With --library-folder the calls go to that
+TurboActivate library (the real one, or a stub) instead.
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+
+from turboactivate import TurboActivate, TurboActivateError
+
+PRODUCT_KEY = "AAAA-BBBB-CCCC-DDDD-EEEE-FFFF-GGGG"
+
+FAKE_GUID = "00000000000000000000000.00000000"
+
+# The calls the mix can use
+OPERATIONS = {
+    "get_extra_data": lambda ta, args: ta.get_extra_data(),
+    "get_feature_value": lambda ta, args: ta.get_feature_value(args.feature),
+    "get_pkey": lambda ta, args: ta.get_pkey(),
+    "has_feature": lambda ta, args: ta.has_feature(args.feature),
+    "is_activated": lambda ta, args: ta.is_activated(),
+    "is_date_valid": lambda ta, args: ta.is_date_valid("2099-01-01 00:00:00"),
+    "is_genuine": lambda ta, args: ta.is_genuine(),
+    "is_genuine_ex": lambda ta, args: ta.is_genuine_ex(args.days_between_checks, args.grace_days),
+    "is_product_key_valid": lambda ta, args: ta.is_product_key_valid(),
+}
+
+DEFAULT_MIX = "get_feature_value=90,is_activated=9,is_genuine_ex=1"
+
+# Latencies are counted in logarithmic buckets 1% wide, so the histograms
+# of every thread and process can be merged and stay small.
+_BUCKETS_PER_E = 1 / math.log(1.01)
+
+
+class Histogram(object):
+
+    """A latency histogram with a 1% resolution."""
+
+    def __init__(self, counts=None):
+        self.counts = counts or {}
+
+    def add(self, seconds):
+        bucket = int(math.log(max(seconds, 1e-9) * 1e9) * _BUCKETS_PER_E)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+
+    def merge(self, other):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+
+    @property
+    def total(self):
+        return sum(self.counts.values())
+
+    def percentile(self, percent):
+        """The latency (in seconds) that percent % of the calls didn't exceed."""
+        total = self.total
+
+        if not total:
+            return 0.0
+
+        wanted = total * percent / 100.0
+        seen = 0
+
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+
+            if seen >= wanted:
+                # the top of the bucket
+                return math.exp((bucket + 1) / _BUCKETS_PER_E) / 1e9
+
+        return 0.0
+
+
+def parse_mix(text):
+    """Parses "name=weight,..." into a list of (name, weight) tuples."""
+    mix = []
+
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+
+        if name not in OPERATIONS:
+            raise ValueError("unknown call %r (one of: %s)" % (name, ", ".join(sorted(OPERATIONS))))
+
+        mix.append((name, float(weight or 1)))
+
+    return mix
+
+
+def make_turboactivate(args):
+    """Creates the TurboActivate object a worker process calls."""
+    if args.library_folder:
+        return TurboActivate(args.guid,
+                             dat_file_loc=args.dat or os.path.join(args.library_folder, "TurboActivate.dat"),
+                             library_folder=args.library_folder)
+
+    from turboactivate.c_wrapper import TA_E_INET
+    from turboactivate.fake import FakeTurboActivate, NETWORK_FUNCTIONS, lognormal
+
+    latency = None
+    failures = None
+
+    if args.network_latency_ms:
+        latency = dict.fromkeys(NETWORK_FUNCTIONS, lognormal(args.network_latency_ms / 1000.0, 0.5))
+
+    if args.failure_rate:
+        failures = dict.fromkeys(NETWORK_FUNCTIONS, (args.failure_rate, TA_E_INET))
+
+    fake = FakeTurboActivate(product_keys={PRODUCT_KEY: {args.feature: "10"}},
+                             latency=latency, failures=failures, seed=args.seed)
+
+    ta = TurboActivate(FAKE_GUID, backend=fake)
+
+    # the setup doesn't go through the latency and failures
+    fake.__class__.TA_CheckAndSavePKey(fake, ta._handle, PRODUCT_KEY, 0)
+    fake._activate(ta._handle, "")
+
+    return ta
+
+
+def run_threads(args, threads, start_barrier=None):
+    """
+    Runs the mix on "threads" threads for args.duration seconds. Returns
+    (elapsed seconds, {call name: Histogram}, {call name: error count}).
+    """
+    ta = make_turboactivate(args)
+    mix = parse_mix(args.mix)
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+
+    results = []
+    ready = threading.Barrier(threads + 1)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        calls = [OPERATIONS[name] for name in names]
+        histograms = dict((name, Histogram()) for name in names)
+        errors = dict.fromkeys(names, 0)
+
+        # pick the calls up front, so picking isn't measured
+        picks = [rng.choices(range(len(names)), weights)[0] for _ in range(4096)]
+
+        ready.wait()
+        end = time.perf_counter() + args.duration
+        i = 0
+
+        while True:
+            index = picks[i & 4095]
+            name = names[index]
+            i += 1
+
+            start = time.perf_counter()
+
+            try:
+                calls[index](ta, args)
+            except TurboActivateError:
+                errors[name] += 1
+
+            now = time.perf_counter()
+            histograms[name].add(now - start)
+
+            if now >= end:
+                break
+
+        results.append((histograms, errors))
+
+    workers = [threading.Thread(target=worker, args=((args.seed or 0) * 1000 + n,)) for n in range(threads)]
+
+    for thread in workers:
+        thread.daemon = True
+        thread.start()
+
+    if start_barrier is not None:
+        start_barrier.wait()
+
+    ready.wait()
+    start = time.perf_counter()
+
+    for thread in workers:
+        thread.join()
+
+    elapsed = time.perf_counter() - start
+
+    histograms = dict((name, Histogram()) for name in names)
+    errors = dict.fromkeys(names, 0)
+
+    for thread_histograms, thread_errors in results:
+        for name in names:
+            histograms[name].merge(thread_histograms[name])
+            errors[name] += thread_errors[name]
+
+    return elapsed, histograms, errors
+
+
+def _process_main(args, threads, start_barrier, output):
+    elapsed, histograms, errors = run_threads(args, threads, start_barrier)
+
+    output.put((elapsed, dict((name, h.counts) for name, h in histograms.items()), errors))
+
+
+def run_step(args, threads):
+    """Runs one step (a thread count) on args.processes processes and returns its report."""
+    if args.processes == 1:
+        elapsed, histograms, errors = run_threads(args, threads)
+        runs = [(elapsed, histograms, errors)]
+    else:
+        start_barrier = multiprocessing.Barrier(args.processes)
+        output = multiprocessing.Queue()
+        processes = [multiprocessing.Process(target=_process_main, args=(args, threads, start_barrier, output))
+                     for _ in range(args.processes)]
+
+        for process in processes:
+            process.start()
+
+        runs = []
+
+        for _ in processes:
+            elapsed, counts, errors = output.get()
+            runs.append((elapsed, dict((name, Histogram(c)) for name, c in counts.items()), errors))
+
+        for process in processes:
+            process.join()
+
+    total = Histogram()
+    by_call = {}
+    errors = {}
+
+    for elapsed, histograms, run_errors in runs:
+        for name, histogram in histograms.items():
+            total.merge(histogram)
+            by_call.setdefault(name, Histogram()).merge(histogram)
+            errors[name] = errors.get(name, 0) + run_errors[name]
+
+    elapsed = max(run[0] for run in runs)
+
+    return {
+        "threads": threads,
+        "processes": args.processes,
+        "calls": total.total,
+        "errors": sum(errors.values()),
+        "calls_per_second": total.total / elapsed,
+        "p50_us": total.percentile(50) * 1e6,
+        "p99_us": total.percentile(99) * 1e6,
+        "p999_us": total.percentile(99.9) * 1e6,
+        "by_call": dict((name, {"calls": h.total,
+                                "errors": errors[name],
+                                "p50_us": h.percentile(50) * 1e6,
+                                "p99_us": h.percentile(99) * 1e6,
+                                "p999_us": h.percentile(99.9) * 1e6})
+                        for name, h in by_call.items()),
+    }
+
+
+def _print_report(report, baseline):
+    print("%8d %10d %14.0f %9.2fx %10.1f %10.1f %10.1f %8d" % (
+        report["threads"], report["processes"], report["calls_per_second"],
+        report["calls_per_second"] / baseline, report["p50_us"], report["p99_us"],
+        report["p999_us"], report["errors"]))
+
+
+def _parser():
+    parser = argparse.ArgumentParser(prog="python -m turboactivate.loadtest",
+                                     description="Load test the TurboActivate wrapper.")
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help="calls and their weights (default: %s). Calls: %s"
+                             % (DEFAULT_MIX, ", ".join(sorted(OPERATIONS))))
+    parser.add_argument("--threads", default="1,2,4,8,16,32",
+                        help="comma separated thread counts to step through (default: 1,2,4,8,16,32)")
+    parser.add_argument("--processes", type=int, default=1, help="processes per step (default: 1)")
+    parser.add_argument("--duration", type=float, default=5, help="seconds per step (default: 5)")
+    parser.add_argument("--feature", default="seats", help="feature name to read (default: seats)")
+    parser.add_argument("--days-between-checks", type=int, default=90)
+    parser.add_argument("--grace-days", type=int, default=14)
+    parser.add_argument("--seed", type=int, default=1, help="random seed (default: 1)")
+    parser.add_argument("--per-call", action="store_true", help="also print the latencies of each call")
+    parser.add_argument("--json", action="store_true", help="print the reports as JSON")
+
+    fake = parser.add_argument_group("fake library (the default)")
+    fake.add_argument("--network-latency-ms", type=float, default=0,
+                      help="median latency of the network calls (default: 0)")
+    fake.add_argument("--failure-rate", type=float, default=0,
+                      help="fraction of network calls failing with TA_E_INET (default: 0)")
+
+    library = parser.add_argument_group("TurboActivate library")
+    library.add_argument("--library-folder", help="use the TurboActivate library in this folder")
+    library.add_argument("--dat", help="path to TurboActivate.dat (default: in the library folder)")
+    library.add_argument("--guid", default=os.environ.get("TURBOACTIVATE_GUID"),
+                         help="the version GUID (default: $TURBOACTIVATE_GUID)")
+
+    return parser
+
+
+def main(argv=None):
+    parser = _parser()
+    args = parser.parse_args(argv)
+
+    try:
+        parse_mix(args.mix)
+        thread_counts = [int(n) for n in args.threads.split(",")]
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.library_folder and not args.guid:
+        parser.error("--guid (or TURBOACTIVATE_GUID) is needed with --library-folder")
+
+    reports = []
+
+    if not args.json:
+        print("mix: %s, %d process(es), %g s per step" % (args.mix, args.processes, args.duration))
+        print("%8s %10s %14s %10s %10s %10s %10s %8s" % ("threads", "processes", "calls/s", "scaling",
+                                                         "p50 (us)", "p99 (us)", "p999 (us)", "errors"))
+
+    for threads in thread_counts:
+        report = run_step(args, threads)
+        reports.append(report)
+
+        if not args.json:
+            _print_report(report, reports[0]["calls_per_second"])
+
+            if args.per_call:
+                for name, stats in sorted(report["by_call"].items()):
+                    print("    %-22s %10d calls %10.1f %10.1f %10.1f %8d" % (
+                        name, stats["calls"], stats["p50_us"], stats["p99_us"], stats["p999_us"],
+                        stats["errors"]))
+
+    if args.json:
+        json.dump(reports, sys.stdout, indent=2)
+        print()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
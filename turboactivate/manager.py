@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+Checks the licenses of many products (for example, one per plugin) at once:
+
+    manager = LicenseManager({"editor": "18324776654b3946fc44a5f3.49025204",
+                              "exporter": "..."})
+
+    batch = manager.status_all(90, 14, deadline=5)
+
+    for name, status in batch.results.items():
+        ...
+
+Every product is a TurboActivate object over the same library and
+TurboActivate.dat, so those are loaded only once. The batch operations run
+on a bounded thread pool, so startup takes about as long as the slowest
+product instead of the sum of all of them.
+"""
+
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from turboactivate import TurboActivate
+from turboactivate.c_wrapper import TA_USER
+from turboactivate.registry import register_after_fork
+
+
+class ProductStatus(namedtuple("ProductStatus", "activated genuine")):
+
+    """
+    The status of one product:
+
+    activated - whether the product is activated (ta.is_activated())
+    genuine   - the IsGenuineResult of ta.is_genuine_ex()
+    """
+
+    __slots__ = ()
+
+
+class BatchResult(namedtuple("BatchResult", "results errors pending")):
+
+    """
+    The outcome of a batch operation, by product name:
+
+    results - dict of the values of the products that finished
+    errors  - dict of the exceptions raised for the products that failed
+    pending - set of the products that were still running at the deadline
+              (their native calls go on in the background)
+    """
+
+    __slots__ = ()
+
+    @property
+    def complete(self):
+        """True if every product finished without an error."""
+        return not self.errors and not self.pending
+
+
+class LicenseManager(object):
+
+    def __init__(self, products, flags=TA_USER, dat_file_loc="", library_folder="",
+                 max_workers=8, cache_ttl=0, retry=None):
+        """
+        products is a dict of {name: version GUID}, or a list of version
+        GUIDs (then the GUIDs are the names). The other arguments are passed
+        to every TurboActivate object. Batch operations run on at most
+        max_workers threads.
+
+        The products are loaded lazily, so a bad GUID is reported by the
+        first batch operation (in BatchResult.errors) instead of here.
+        """
+        if not isinstance(products, dict):
+            products = dict((guid, guid) for guid in products)
+
+        self.products = dict(
+            (name, TurboActivate(guid, flags, dat_file_loc, library_folder,
+                                 cache_ttl=cache_ttl, lazy=True, retry=retry))
+            for name, guid in products.items())
+
+        self._max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+        register_after_fork(self)
+
+    def __getitem__(self, name):
+        """Returns the TurboActivate object of the product "name"."""
+        return self.products[name]
+
+    def status_all(self, days_between_checks, grace_days_on_inet_err, skip_offline=False,
+                   offline_show_inet_err=False, deadline=None):
+        """
+        Returns a BatchResult of the ProductStatus of every product. deadline
+        is the number of seconds to wait for the whole batch (None waits
+        until every product is done).
+        """
+        def status(ta):
+            genuine = ta.is_genuine_ex(days_between_checks, grace_days_on_inet_err,
+                                       skip_offline, offline_show_inet_err)
+
+            return ProductStatus(ta.is_activated(), genuine)
+
+        return self.run_all(status, deadline)
+
+    def is_genuine_ex_all(self, days_between_checks, grace_days_on_inet_err, skip_offline=False,
+                          offline_show_inet_err=False, deadline=None):
+        """Returns a BatchResult of ta.is_genuine_ex() for every product."""
+        return self.run_all(
+            lambda ta: ta.is_genuine_ex(days_between_checks, grace_days_on_inet_err,
+                                        skip_offline, offline_show_inet_err),
+            deadline)
+
+    def features_all(self, names, deadline=None):
+        """Returns a BatchResult of ta.get_feature_values(names) for every product."""
+        return self.run_all(lambda ta: ta.get_feature_values(names), deadline)
+
+    def run_all(self, func, deadline=None):
+        """
+        Calls func(ta) for the TurboActivate object of every product on the
+        thread pool, and returns a BatchResult of whatever finished within
+        deadline seconds.
+        """
+        end = None if deadline is None else time.monotonic() + deadline
+
+        executor = self._get_executor()
+        futures = dict((executor.submit(func, ta), name) for name, ta in self.products.items())
+
+        done, not_done = wait(futures, None if end is None else max(0, end - time.monotonic()))
+
+        results = {}
+        errors = {}
+
+        for future in done:
+            name = futures[future]
+            error = future.exception()
+
+            if error is None:
+                results[name] = future.result()
+            else:
+                errors[name] = error
+
+        # the calls that haven't started yet are dropped, the running ones
+        # can't be interrupted
+        for future in not_done:
+            future.cancel()
+
+        return BatchResult(results, errors, set(futures[future] for future in not_done))
+
+    def close(self, wait=True):
+        """Shuts down the thread pool. Running calls are finished first if wait is True."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close(wait=False)
+
+    def _after_fork(self):
+        # The pool's threads weren't copied to the child: the next batch
+        # starts a new pool.
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                    thread_name_prefix="turboactivate")
+
+            return self._executor
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+Counters and latency histograms for the native TurboActivate calls.
+
+    from turboactivate.metrics import Metrics
+
+    metrics = Metrics()
+    metrics.enable()
+
+    ...
+
+    metrics.snapshot()      # a dict, keyed by TA_* function name
+    metrics.to_prometheus() # the Prometheus text exposition format
+
+Nothing is recorded (and nothing is slowed down) until enable() is called.
+"""
+
+import bisect
+import threading
+
+from turboactivate import c_wrapper, hooks
+
+
+# Upper bounds, in seconds, of the latency histogram buckets. Local calls
+# take microseconds, calls to the activation servers can take many seconds.
+DEFAULT_BUCKETS = (0.00001, 0.0001, 0.001, 0.01, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+
+def _return_code_names():
+    names = {}
+
+    for name in sorted(dir(c_wrapper)):
+        if name == "TA_OK" or name == "TA_FAIL" or name.startswith("TA_E_"):
+            names.setdefault(getattr(c_wrapper, name), name)
+
+    return names
+
+
+# TA_* return code -> name, e.g. 4 -> "TA_E_INET"
+RETURN_CODE_NAMES = _return_code_names()
+
+
+class _FunctionMetrics(object):
+
+    __slots__ = ("calls", "seconds", "errors", "buckets")
+
+    def __init__(self, bucket_count):
+        self.calls = 0
+        self.seconds = 0.0
+        self.errors = {}
+
+        # one more than the bounds, for the calls slower than the last bound
+        self.buckets = [0] * (bucket_count + 1)
+
+
+class Metrics(object):
+
+    """Records the call count, return codes, and latency of every native function."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+
+        self._lock = threading.Lock()
+        self._functions = {}
+
+    def enable(self):
+        """Starts recording every native TurboActivate call."""
+        hooks.add_observer(self)
+
+    def disable(self):
+        """Stops recording. The metrics recorded so far are kept."""
+        hooks.remove_observer(self)
+
+    def _after_fork(self):
+        # the calls recorded so far are the parent's (and exported by it)
+        self._lock = threading.Lock()
+        self._functions = {}
+
+    def reset(self):
+        """Forgets everything recorded so far."""
+        with self._lock:
+            self._functions = {}
+
+    def __call__(self, name, args, start, duration, return_code):
+        with self._lock:
+            function = self._functions.get(name)
+
+            if function is None:
+                function = self._functions[name] = _FunctionMetrics(len(self.buckets))
+
+            function.calls += 1
+            function.seconds += duration
+            function.buckets[bisect.bisect_left(self.buckets, duration)] += 1
+
+            if return_code != c_wrapper.TA_OK:
+                function.errors[return_code] = function.errors.get(return_code, 0) + 1
+
+    def snapshot(self):
+        """
+        Returns the metrics as a dict keyed by TA_* function name. Each value
+        is a dict with the number of "calls", the total "seconds" spent in the
+        function, the "errors" keyed by return code name, and the cumulative
+        latency histogram "buckets" as (upper bound, calls) pairs.
+        """
+        with self._lock:
+            snapshot = {}
+
+            for name, function in self._functions.items():
+                cumulative = 0
+                buckets = []
+
+                for bound, count in zip(self.buckets + (float("inf"),), function.buckets):
+                    cumulative += count
+                    buckets.append((bound, cumulative))
+
+                snapshot[name] = {
+                    "calls": function.calls,
+                    "seconds": function.seconds,
+                    "errors": dict((RETURN_CODE_NAMES.get(code, str(code)), count)
+                                   for code, count in function.errors.items()),
+                    "buckets": buckets,
+                }
+
+            return snapshot
+
+    def to_prometheus(self, prefix="turboactivate"):
+        """Returns the metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+
+        lines.append("# HELP %s_calls_total Native TurboActivate function calls." % prefix)
+        lines.append("# TYPE %s_calls_total counter" % prefix)
+
+        for name in sorted(snapshot):
+            lines.append('%s_calls_total{function="%s"} %d' % (prefix, name, snapshot[name]["calls"]))
+
+        lines.append("# HELP %s_errors_total Native TurboActivate calls that didn't return TA_OK." % prefix)
+        lines.append("# TYPE %s_errors_total counter" % prefix)
+
+        for name in sorted(snapshot):
+            for code, count in sorted(snapshot[name]["errors"].items()):
+                lines.append('%s_errors_total{function="%s",code="%s"} %d' % (prefix, name, code, count))
+
+        lines.append("# HELP %s_call_duration_seconds Native TurboActivate call latency." % prefix)
+        lines.append("# TYPE %s_call_duration_seconds histogram" % prefix)
+
+        for name in sorted(snapshot):
+            function = snapshot[name]
+
+            for bound, count in function["buckets"]:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append('%s_call_duration_seconds_bucket{function="%s",le="%s"} %d'
+                             % (prefix, name, le, count))
+
+            lines.append('%s_call_duration_seconds_sum{function="%s"} %r' % (prefix, name, function["seconds"]))
+            lines.append('%s_call_duration_seconds_count{function="%s"} %d' % (prefix, name, function["calls"]))
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+Checks the license on a background thread, so request threads never have
+to wait on the native library:
+
+    monitor = LicenseMonitor(ta, DAYS_BETWEEN_CHECKS, GRACE_PERIOD_LENGTH, True)
+    monitor.start()
+
+    ...
+
+    if monitor.status.result == IsGenuineResult.Genuine:
+        ...
+"""
+
+import random
+import threading
+import time
+from collections import namedtuple
+
+from turboactivate import IsGenuineResult
+from turboactivate.c_wrapper import TurboActivateInetError
+from turboactivate.registry import register_after_fork, unregister_after_fork
+
+
+class LicenseStatus(namedtuple("LicenseStatus", "result checked_at error failures")):
+
+    """
+    The outcome of the latest check:
+
+    result     - the IsGenuineResult, or None if the check raised an error
+    checked_at - when the check finished, as a time.time() timestamp
+    error      - the exception raised by the check (usually a
+                 TurboActivateError), or None
+    failures   - how many checks in a row failed with an internet error
+    """
+
+    __slots__ = ()
+
+
+class LicenseMonitor(object):
+
+    def __init__(self, ta, days_between_checks, grace_days_on_inet_err, skip_offline=False,
+                 offline_show_inet_err=False, interval=3600, jitter=0.1, retry_interval=60):
+        """
+        Calls ta.is_genuine_ex() with the given arguments every "interval"
+        seconds, give or take "jitter" (a fraction of the interval) so many
+        processes don't all check at the same moment. After an internet error
+        the check is retried after retry_interval seconds, doubling with each
+        failure in a row up to the regular interval.
+        """
+        self._ta = ta
+        self._args = (days_between_checks, grace_days_on_inet_err, skip_offline, offline_show_inet_err)
+
+        self.interval = interval
+        self.jitter = jitter
+        self.retry_interval = retry_interval
+
+        self._status = None
+        self._checked = threading.Event()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    @property
+    def status(self):
+        """
+        The latest LicenseStatus, or None before the first check has finished.
+        Reading it never blocks: each check publishes a new, immutable object.
+        """
+        return self._status
+
+    def start(self):
+        """
+        Starts checking on a daemon thread. The first check runs right away.
+        A started monitor also starts a new thread in the child processes
+        forked from this one.
+        """
+        if self._thread is not None:
+            return
+
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="turboactivate-monitor")
+        self._thread.daemon = True
+        self._thread.start()
+
+        register_after_fork(self)
+
+    def stop(self, timeout=None):
+        """Stops the background thread (after the check in progress, if any)."""
+        thread = self._thread
+
+        if thread is None:
+            return
+
+        unregister_after_fork(self)
+
+        self._stopped = True
+        self._wake.set()
+        thread.join(timeout)
+
+        self._thread = None
+
+    def check_now(self):
+        """Wakes the background thread up to check right away."""
+        self._wake.set()
+
+    def wait(self, timeout=None):
+        """Waits for the first check to finish and returns its LicenseStatus."""
+        self._checked.wait(timeout)
+        return self._status
+
+    def _after_fork(self):
+        # The checking thread wasn't copied to the child: start a new one.
+        checked = self._checked.is_set()
+
+        self._checked = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+        if checked:
+            self._checked.set()
+
+        self.start()
+
+    def _check(self):
+        previous = self._status
+        failures = previous.failures if previous is not None else 0
+
+        try:
+            result = self._ta.is_genuine_ex(*self._args)
+            error = None
+        except Exception as e:
+            # published rather than raised: an unexpected error mustn't
+            # end the thread and leave the last status up forever
+            result = None
+            error = e
+
+        if result == IsGenuineResult.InternetError or isinstance(error, TurboActivateInetError):
+            failures += 1
+        else:
+            failures = 0
+
+        self._status = LicenseStatus(result, time.time(), error, failures)
+        self._checked.set()
+
+        return failures
+
+    def _delay(self, failures):
+        if failures:
+            delay = min(self.retry_interval * 2 ** (failures - 1), self.interval)
+        else:
+            delay = self.interval
+
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _run(self):
+        while not self._stopped:
+            failures = self._check()
+
+            self._wake.wait(self._delay(failures))
+            self._wake.clear()
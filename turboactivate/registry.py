@@ -0,0 +1,307 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+import os
+import sys
+import threading
+import weakref
+
+from turboactivate import hooks
+from turboactivate.state import HandleState
+from turboactivate.c_wrapper import (
+    bind_library,
+    cached_wstr,
+    load_library,
+    TurboActivateDatFileError,
+    TurboActivateFailError
+)
+
+
+class _BackendTables(object):
+
+    """
+    What the registry knows about one backend. Nothing in here refers to the
+    backend, so the tables go away with it, and the HandleStates go away
+    with the last TurboActivate object using them.
+    """
+
+    __slots__ = ("dat_files", "handles", "guids", "states")
+
+    def __init__(self):
+        # the dat files loaded so far
+        self.dat_files = set()
+
+        # (dat file, guid) -> handle
+        self.handles = {}
+
+        # handle -> guid (see LibraryRegistry.guid_of())
+        self.guids = {}
+
+        # handle -> HandleState
+        self.states = weakref.WeakValueDictionary()
+
+
+class LibraryRegistry(object):
+    """
+    Process-wide registry of the loaded TurboActivate libraries, product
+    details files ("TurboActivate.dat"), and version handles.
+
+    Each library is loaded once, each TurboActivate.dat file is loaded once
+    per library, and each version GUID is only looked up once, so every
+    TurboActivate object after the first one is nearly free to create.
+
+    The registry survives os.fork(): a child process keeps using the
+    libraries and handles loaded by its parent (see TurboActivate.warm_up())
+    without loading anything again, and only the locks, queues, and threads
+    of the shared state are recreated. TurboActivate's own background work
+    isn't copied by fork: the trial callbacks have to be set again in the
+    child, which registers the native callback again (see TrialEvents).
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+
+        # library folder -> CDLL
+        self._libraries = {}
+
+        # backend passed to TurboActivate(backend=...) -> _BackendTables,
+        # forgotten once the backend is gone (one per test, for fakes)
+        self._backends = weakref.WeakKeyDictionary()
+
+        # library folder -> the dat files loaded by that library
+        self._dat_files = {}
+
+        # (library folder, dat file, guid) -> (CDLL, handle)
+        self._handles = {}
+
+        # handle -> guid, or None if libraries use the handle for different
+        # GUIDs (looked up for every traced call)
+        self._guids = {}
+
+        # (CDLL, handle) -> HandleState
+        self._states = {}
+
+    def get_library(self, library_folder):
+        """Returns the TurboActivate library in library_folder, loading it if needed."""
+        library_folder = os.path.abspath(library_folder)
+        lib = self._libraries.get(library_folder)
+
+        if lib is None:
+            with self._lock:
+                lib = self._libraries.get(library_folder)
+
+                if lib is None:
+                    lib = load_library(library_folder)
+                    bind_library(lib)
+                    hooks.track(lib)
+
+                    self._libraries[library_folder] = lib
+
+        return lib
+
+    def get_handle(self, library_folder, dat_file_loc, guid, backend=None):
+        """
+        Returns a (library, handle) tuple for the version GUID, loading the
+        library and the TurboActivate.dat file as needed. With a backend
+        (see turboactivate.backend) it's used instead of the library in
+        library_folder.
+        """
+        dat_file_loc = os.path.abspath(dat_file_loc)
+
+        if backend is not None:
+            return self._get_backend_handle(backend, dat_file_loc, guid)
+
+        library_folder = os.path.abspath(library_folder)
+        key = (library_folder, dat_file_loc, guid)
+
+        entry = self._handles.get(key)
+
+        if entry is not None:
+            return entry
+
+        with self._lock:
+            entry = self._handles.get(key)
+
+            if entry is not None:
+                return entry
+
+            lib = self.get_library(library_folder)
+            dat_files = self._dat_files.setdefault(library_folder, set())
+            handle = self._load_handle(lib, dat_files, dat_file_loc, guid)
+            _add_guid(self._guids, handle, guid)
+
+            entry = (lib, handle)
+            self._handles[key] = entry
+
+        return entry
+
+    def _get_backend_handle(self, backend, dat_file_loc, guid):
+        key = (dat_file_loc, guid)
+        tables = self._backends.get(backend)
+        handle = tables.handles.get(key) if tables is not None else None
+
+        if handle is not None:
+            return backend, handle
+
+        with self._lock:
+            tables = self._backends.get(backend)
+
+            if tables is None:
+                hooks.track(backend)
+                tables = self._backends[backend] = _BackendTables()
+
+            handle = tables.handles.get(key)
+
+            if handle is None:
+                handle = self._load_handle(backend, tables.dat_files, dat_file_loc, guid)
+                _add_guid(tables.guids, handle, guid)
+                tables.handles[key] = handle
+
+        return backend, handle
+
+    @staticmethod
+    def _load_handle(lib, dat_files, dat_file_loc, guid):
+        # Loads the dat file (unless it's in dat_files, the set of the dat
+        # files lib has loaded) and returns the handle of guid.
+        if dat_file_loc not in dat_files:
+            try:
+                lib.TA_PDetsFromPath(cached_wstr(dat_file_loc))
+            except TurboActivateFailError:
+                # The dat file was already loaded outside of the registry
+                pass
+
+            dat_files.add(dat_file_loc)
+
+        handle = lib.TA_GetHandle(cached_wstr(guid))
+
+        # if the handle is unset then immediately throw an exception
+        # telling the user that they need to actually load the correct
+        # TurboActivate.dat and/or use the correct GUID for the TurboActivate.dat
+        if handle == 0:
+            raise TurboActivateDatFileError()
+
+        return handle
+
+    def guid_of(self, handle):
+        """
+        Returns the version GUID of a handle, or None if it isn't known (or
+        more than one library uses the same handle for different GUIDs).
+        """
+        guid = self._guids.get(handle)
+
+        if guid is None:
+            for tables in list(self._backends.values()):
+                guid = tables.guids.get(handle)
+
+                if guid is not None:
+                    break
+
+        return guid
+
+    def get_state(self, lib, handle):
+        """Returns the HandleState shared by every user of the handle."""
+        tables = self._backends.get(lib)
+
+        if tables is None:
+            states, key = self._states, (lib, handle)
+        else:
+            states, key = tables.states, handle
+
+        state = states.get(key)
+
+        if state is None:
+            with self._lock:
+                state = states.get(key)
+
+                if state is None:
+                    state = states[key] = HandleState()
+
+        return state
+
+    def _before_fork(self):
+        # fork with the registry in a consistent state, not in the middle
+        # of loading a library or a handle on another thread
+        self._lock.acquire()
+
+    def _after_fork_in_parent(self):
+        self._lock.release()
+
+    def _after_fork_in_child(self):
+        self._lock = threading.RLock()
+
+        states = list(self._states.values())
+
+        for tables in list(self._backends.values()):
+            states.extend(tables.states.values())
+
+        for state in states:
+            state._after_fork()
+
+
+def _add_guid(guids, handle, guid):
+    # a handle used for different GUIDs (by different libraries) has none
+    guids[handle] = guid if guids.get(handle, guid) == guid else None
+
+
+# The registry shared by every TurboActivate object in the process.
+registry = LibraryRegistry()
+
+# the objects whose _after_fork() is called in the child (see register_after_fork())
+_fork_aware = weakref.WeakSet()
+
+
+def register_after_fork(obj):
+    """
+    Calls obj._after_fork() in the child process after every os.fork()
+    (Python 3.7+), as long as obj is alive and until unregister_after_fork().
+    It's called after the registry, the hooks, and the deadline runner are
+    usable again, so it can start threads that make native calls.
+    """
+    _fork_aware.add(obj)
+
+
+def unregister_after_fork(obj):
+    """Stops calling obj._after_fork() after os.fork()."""
+    _fork_aware.discard(obj)
+
+
+def _after_fork_in_child():
+    registry._after_fork_in_child()
+    hooks._after_fork()
+
+    # only imported by the first call with a timeout
+    deadline = sys.modules.get("turboactivate.deadline")
+
+    if deadline is not None:
+        deadline.runner._after_fork()
+
+    for obj in list(_fork_aware):
+        obj._after_fork()
+
+
+# os.register_at_fork() is Python 3.7+ (and POSIX only)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(before=registry._before_fork,
+                        after_in_parent=registry._after_fork_in_parent,
+                        after_in_child=_after_fork_in_child)
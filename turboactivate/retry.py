@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+Retries the calls that go to the LimeLM servers when they fail with an
+internet error, and stops calling the servers for a while after too many
+failures in a row:
+
+    policy = RetryPolicy(attempts=4, base_delay=1, deadline=20,
+                         breaker=CircuitBreaker(failures=5, cooldown=300))
+
+    ta = TurboActivate("18324776654b3946fc44a5f3.49025204", retry=policy)
+
+Whether a failure is worth retrying is decided by its TA_* return code (see
+RETRYABLE_CODES), never by the text of the exception.
+"""
+
+import random
+import threading
+import time
+
+from turboactivate.c_wrapper import (
+    TA_E_INET,
+    TA_E_INET_TIMEOUT,
+    TA_E_INET_TLS,
+    TurboActivateCircuitOpenError,
+)
+
+
+# The return codes of the failures that may go away by trying again later.
+# Every other code (a bad product key, a revoked license, ...) is final.
+RETRYABLE_CODES = frozenset((
+    TA_E_INET,
+    TA_E_INET_TIMEOUT,
+    TA_E_INET_TLS,
+))
+
+
+class CircuitBreaker(object):
+    """
+    Counts the retryable failures in a row. Once there are "failures" of them
+    the breaker opens, and calls fail fast (without calling TurboActivate)
+    for "cooldown" seconds. Then one call is let through: if it succeeds the
+    breaker closes again, if it fails the breaker stays open for another
+    cooldown.
+
+    One breaker can be shared by many RetryPolicy objects, so all the
+    products of an app stop calling the servers at once.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failures=5, cooldown=60):
+        self.failures = failures
+        self.cooldown = cooldown
+
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def __getstate__(self):
+        # a copy in another process starts closed, with its own lock
+        return {"failures": self.failures, "cooldown": self.cooldown}
+
+    def __setstate__(self, state):
+        self.__init__(state["failures"], state["cooldown"])
+
+    @property
+    def state(self):
+        """CLOSED, OPEN, or HALF_OPEN (the cooldown is over)."""
+        with self._lock:
+            return self._state()
+
+    def allow(self):
+        """
+        Returns True if a call may be made now. In the half-open state only
+        the first caller gets True, until its outcome is recorded.
+        """
+        with self._lock:
+            state = self._state()
+
+            if state == self.CLOSED:
+                return True
+
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+
+            return False
+
+    def record_success(self):
+        """Records a call that reached the servers (whatever their answer was)."""
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        """Records a call that failed with a retryable error."""
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+
+            if self._opened_at is not None or self._failures >= self.failures:
+                self._opened_at = time.monotonic()
+
+    def reset(self):
+        """Closes the breaker."""
+        self.record_success()
+
+    def _state(self):
+        if self._opened_at is None:
+            return self.CLOSED
+
+        if time.monotonic() - self._opened_at < self.cooldown:
+            return self.OPEN
+
+        return self.HALF_OPEN
+
+
+class RetryPolicy(object):
+
+    def __init__(self, attempts=3, base_delay=1.0, max_delay=30.0, multiplier=2.0, jitter=0.5,
+                 deadline=None, breaker=None, retryable=RETRYABLE_CODES):
+        """
+        Makes up to "attempts" calls. The n-th retry waits base_delay *
+        multiplier ** (n - 1) seconds (at most max_delay), minus a random
+        fraction of up to "jitter" so many processes don't retry in step.
+        deadline is the total number of seconds for all the attempts and
+        delays (None for no limit): no retry is started that would have to
+        wait past it. breaker is an optional CircuitBreaker, and retryable
+        the set of return codes that are retried.
+        """
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.deadline = deadline
+        self.breaker = breaker
+        self.retryable = retryable
+
+    def call(self, func, *args):
+        """
+        Calls func(*args), a native TurboActivate function, retrying as long
+        as it fails with a retryable return code, either returned (for the
+        functions that return a status) or in the exception it raises.
+
+        Returns the last return value or raises the last exception. Raises
+        TurboActivateCircuitOpenError without calling func if the breaker
+        is open.
+        """
+        if self.breaker is not None and not self.breaker.allow():
+            raise TurboActivateCircuitOpenError()
+
+        end = None if self.deadline is None else time.monotonic() + self.deadline
+        attempt = 1
+
+        while True:
+            error = None
+
+            try:
+                result = func(*args)
+                return_code = result
+            except Exception as e:
+                error = e
+                return_code = getattr(e, "return_code", None)
+
+            if not self._failed(return_code) or not self._wait(attempt, end):
+                break
+
+            attempt += 1
+
+        if error is not None:
+            raise error
+
+        return result
+
+    def delay(self, attempt):
+        """The number of seconds to wait after the failed attempt number "attempt"."""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+
+        return delay * (1 - random.uniform(0, self.jitter))
+
+    def _failed(self, return_code):
+        # Tells the breaker about the outcome, and returns True if it's worth
+        # another try.
+        failed = return_code in self.retryable
+
+        if self.breaker is not None:
+            if failed:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+
+        return failed
+
+    def _wait(self, attempt, end):
+        # Sleeps before the next attempt. Returns False (without sleeping) if
+        # there are no attempts or time left.
+        if attempt >= self.attempts:
+            return False
+
+        # this failure opened the breaker
+        if self.breaker is not None and self.breaker.state != CircuitBreaker.CLOSED:
+            return False
+
+        delay = self.delay(attempt)
+
+        if end is not None and time.monotonic() + delay >= end:
+            return False
+
+        time.sleep(delay)
+
+        return True
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+License state shared by the worker processes of a pre-fork server (gunicorn,
+uwsgi, ...). POSIX only.
+
+One process, the leader, runs the license checks and publishes the results
+to a small memory mapped file. Every other process just reads that file:
+
+    state = SharedLicenseState(ta, "/run/myapp/license", DAYS_BETWEEN_CHECKS,
+                               GRACE_PERIOD_LENGTH, True, features=["seats"])
+    state.start()
+
+    ...
+
+    snapshot = state.snapshot()
+
+    if snapshot is not None and snapshot.activated:
+        ...
+
+Leadership is an exclusive lockf() lock on "<path>.lock". The kernel drops it
+when the leader exits, and the next process to try the lock takes over. Unlike
+flock() locks, lockf() locks belong to a process and aren't inherited by the
+processes it forks, so a worker forked from the leader never holds up a
+takeover. (The flip side: use one SharedLicenseState per path in a process.)
+
+Readers use a sequence lock: the writer makes the sequence number odd while
+it writes and even again once it's done, and a reader only accepts what it
+read between two identical, even sequence numbers. A snapshot is decoded
+once per sequence number, so reading an unchanged state is a couple of
+memory reads with no system calls.
+"""
+
+import fcntl
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import namedtuple
+
+from turboactivate.c_wrapper import TurboActivateError, is_win
+from turboactivate.registry import register_after_fork, unregister_after_fork
+
+
+MAGIC = b"TASL"
+
+# bumped whenever the layout below changes
+LAYOUT_VERSION = 1
+
+# magic, layout version, (padding), sequence number, payload length, (padding)
+_HEADER = struct.Struct("<4sHxxQI4x")
+_SEQ = struct.Struct("<Q")
+_SEQ_OFFSET = 8
+
+# checked at, genuine result, activated, (padding), trial days. The result,
+# activated flag, and trial days are -1 (0xFFFFFFFF) when unknown. The
+# features follow as a JSON object.
+_STATE = struct.Struct("<dbbxxI")
+
+_UNKNOWN_DAYS = 0xFFFFFFFF
+
+# how many times a reader retries when it keeps racing with the writer
+_READ_ATTEMPTS = 100
+
+
+class SharedLicenseSnapshot(namedtuple("SharedLicenseSnapshot",
+                                       "result activated trial_days features checked_at version")):
+
+    """
+    The license state published by the leader:
+
+    result     - the IsGenuineResult of is_genuine_ex(), or None if it failed
+    activated  - is_activated(), or None if it failed
+    trial_days - trial_days_remaining(), or None if there's no trial
+    features   - dict of the feature values, same types as get_feature_value()
+    checked_at - when the leader collected this state, as a time.time() timestamp
+    version    - increases with every published state
+    """
+
+    __slots__ = ()
+
+
+class SharedLicenseState(object):
+
+    def __init__(self, ta, path, days_between_checks, grace_days_on_inet_err, skip_offline=False,
+                 offline_show_inet_err=False, features=(), verified_trial=True, interval=3600,
+                 takeover_interval=5, size=65536):
+        """
+        Shares the license state of "ta" through the file at path (created
+        if needed, and "size" bytes long). The leader collects the state
+        every "interval" seconds: is_genuine_ex() with the given arguments,
+        is_activated(), trial_days_remaining(verified_trial), and the values
+        of the named features. The other processes try to take over the
+        leadership every takeover_interval seconds.
+        """
+        self._ta = ta
+        self._genuine_args = (days_between_checks, grace_days_on_inet_err, skip_offline, offline_show_inet_err)
+        self._features = tuple(features)
+        self._verified_trial = verified_trial
+
+        self.interval = interval
+        self.takeover_interval = takeover_interval
+
+        self._lock_path = path + ".lock"
+        self._lock_fd = None
+
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        try:
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+
+            self._map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+
+        self._snapshot = None
+        self._error = None
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = None
+
+    @property
+    def is_leader(self):
+        """Whether this process is the one running the license checks."""
+        return self._lock_fd is not None
+
+    @property
+    def error(self):
+        """
+        The exception raised the last time this process failed to collect or
+        publish the state as the leader, or None if it hasn't failed since.
+        """
+        return self._error
+
+    def start(self):
+        """
+        Starts the background thread that leads, or waits to take over
+        leadership. Processes forked from this one start their own thread
+        (as followers).
+        """
+        if self._thread is not None:
+            return
+
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="turboactivate-shared-state")
+        self._thread.daemon = True
+        self._thread.start()
+
+        register_after_fork(self)
+
+    def stop(self, timeout=None):
+        """Stops the background thread and gives up the leadership."""
+        unregister_after_fork(self)
+
+        thread = self._thread
+
+        if thread is not None:
+            self._stopped = True
+            self._wake.set()
+            thread.join(timeout)
+
+            self._thread = None
+
+        self._resign()
+
+    def refresh(self):
+        """Wakes the leader up to collect and publish the state right away."""
+        self._wake.set()
+
+    def snapshot(self):
+        """
+        Returns the latest SharedLicenseSnapshot, or None if no state has been
+        published yet.
+        """
+        shared = self._map
+        cached = self._snapshot
+        seq = _SEQ.unpack_from(shared, _SEQ_OFFSET)[0]
+
+        if cached is not None and cached.version == seq:
+            return cached
+
+        for _ in range(_READ_ATTEMPTS):
+            if not seq & 1:
+                magic, layout, _, length = _HEADER.unpack_from(shared, 0)
+                payload = shared[_HEADER.size:_HEADER.size + length]
+                current = _SEQ.unpack_from(shared, _SEQ_OFFSET)[0]
+
+                if current == seq:
+                    if magic != MAGIC or layout != LAYOUT_VERSION:
+                        return None
+
+                    snapshot = self._snapshot = _decode(seq, payload)
+                    return snapshot
+
+                seq = current
+            else:
+                seq = _SEQ.unpack_from(shared, _SEQ_OFFSET)[0]
+
+        # the writer is stuck in the middle of a write (it probably died
+        # there), keep returning what we had until a new leader rewrites it
+        return cached
+
+    def _after_fork(self):
+        # The child doesn't hold the parent's lock (lockf() locks aren't
+        # inherited), and the background thread wasn't copied: start over
+        # as a follower.
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+        self._wake = threading.Event()
+        self._thread = None
+
+        self.start()
+
+    def _try_lead(self):
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except (IOError, OSError):
+            os.close(fd)
+            return False
+
+        self._lock_fd = fd
+        return True
+
+    def _resign(self):
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _collect(self):
+        ta = self._ta
+
+        try:
+            result = ta.is_genuine_ex(*self._genuine_args)
+        except TurboActivateError:
+            result = None
+
+        try:
+            activated = ta.is_activated()
+        except TurboActivateError:
+            activated = None
+
+        try:
+            trial_days = ta.trial_days_remaining(self._verified_trial)
+        except TurboActivateError:
+            trial_days = None
+
+        features = ta.get_feature_values(self._features)
+
+        return result, activated, trial_days, features
+
+    def _publish(self, result, activated, trial_days, features):
+        if not is_win:
+            features = dict((name, value.decode("utf-8")) for name, value in features.items())
+
+        payload = _STATE.pack(time.time(),
+                              -1 if result is None else result,
+                              -1 if activated is None else int(activated),
+                              _UNKNOWN_DAYS if trial_days is None else trial_days)
+        payload += json.dumps(features, separators=(",", ":")).encode("utf-8")
+
+        shared = self._map
+
+        if _HEADER.size + len(payload) > len(shared):
+            raise ValueError("the license state needs %d bytes, the shared file is only %d bytes"
+                             % (_HEADER.size + len(payload), len(shared)))
+
+        # an odd sequence number means a write is in progress (and stays odd
+        # if the previous leader died halfway through its write)
+        seq = _SEQ.unpack_from(shared, _SEQ_OFFSET)[0] | 1
+
+        _SEQ.pack_into(shared, _SEQ_OFFSET, seq)
+        shared[_HEADER.size:_HEADER.size + len(payload)] = payload
+        _HEADER.pack_into(shared, 0, MAGIC, LAYOUT_VERSION, seq, len(payload))
+        _SEQ.pack_into(shared, _SEQ_OFFSET, seq + 1)
+
+    def _run(self):
+        while not self._stopped:
+            delay = self.takeover_interval
+
+            if self.is_leader or self._try_lead():
+                try:
+                    self._publish(*self._collect())
+                except Exception as e:
+                    # e.g. the state doesn't fit the file, or a feature value
+                    # isn't UTF-8: let another process (or this one, later)
+                    # try, rather than hold the lock and publish nothing
+                    self._error = e
+                    self._resign()
+                else:
+                    self._error = None
+                    delay = self.interval
+
+            self._wake.wait(delay)
+            self._wake.clear()
+
+
+def _decode(seq, payload):
+    checked_at, result, activated, trial_days = _STATE.unpack_from(payload, 0)
+    features = json.loads(payload[_STATE.size:].decode("utf-8"))
+
+    if not is_win:
+        features = dict((name, value.encode("utf-8")) for name, value in features.items())
+
+    return SharedLicenseSnapshot(None if result < 0 else result,
+                                 None if activated < 0 else bool(activated),
+                                 None if trial_days == _UNKNOWN_DAYS else trial_days,
+                                 features,
+                                 checked_at,
+                                 seq)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+import threading
+
+from turboactivate.c_wrapper import TurboActivateTimeoutError
+
+
+class _Call(object):
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Coalesces concurrent identical calls ("single-flight").
+
+    The first thread to call do() with a key runs the function. Every other
+    thread that calls do() with the same key while it's running waits for it
+    and gets the same result (or the same exception) instead of making its
+    own call. The result isn't kept once the call is over, so the next call
+    after that runs the function again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+        # key -> the _Call in flight
+        self._calls = {}
+
+        # key[0] -> [calls, coalesced]
+        self._stats = {}
+
+    def do(self, key, fn, timeout=None):
+        """
+        Returns fn(), or the result of the fn() already running for key.
+        The first item of key names the operation in stats().
+
+        Each caller waits at most timeout seconds (None waits forever) and
+        then raises TurboActivateTimeoutError, while fn() keeps running for
+        the others: it runs on a worker of turboactivate.deadline.runner
+        when the first caller has a timeout, on the first caller's thread
+        otherwise.
+        """
+        with self._lock:
+            counts = self._stats.get(key[0])
+
+            if counts is None:
+                counts = self._stats[key[0]] = [0, 0]
+
+            counts[0] += 1
+            call = self._calls.get(key)
+
+            if call is None:
+                call = self._calls[key] = _Call()
+                leader = True
+            else:
+                counts[1] += 1
+                leader = False
+
+        if not leader:
+            if not call.done.wait(timeout):
+                raise TurboActivateTimeoutError("the call didn't finish in %g seconds" % timeout)
+        elif timeout is None:
+            self._run(key, call, fn)
+        else:
+            from turboactivate.deadline import runner
+
+            try:
+                job = runner.start(self._run, key, call, fn)
+            except TurboActivateTimeoutError as e:
+                # too many calls are stuck already: nothing was started
+                call.error = e
+                self._finish(key, call)
+            else:
+                # The call has no deadline of its own: the leader's timeout
+                # only abandons it (counted by the runner) like any other.
+                runner.wait(job, timeout)
+
+        if call.error is not None:
+            raise call.error
+
+        return call.result
+
+    def _run(self, key, call, fn):
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+        finally:
+            self._finish(key, call)
+
+    def _finish(self, key, call):
+        with self._lock:
+            del self._calls[key]
+
+        call.done.set()
+
+    def stats(self):
+        """
+        Returns {operation: {"calls": n, "coalesced": n}}, where "coalesced"
+        counts the calls that waited for another thread's call instead of
+        making their own.
+        """
+        with self._lock:
+            return dict((name, {"calls": counts[0], "coalesced": counts[1]})
+                        for name, counts in self._stats.items())
+
+    def reset_stats(self):
+        """Sets the counters back to zero."""
+        with self._lock:
+            self._stats = {}
+
+    def _after_fork(self):
+        # The threads running the calls in flight weren't copied to the
+        # child: forget their calls instead of waiting for them forever.
+        self._lock = threading.Lock()
+        self._calls = {}
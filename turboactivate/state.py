@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+The concurrency model of the TurboActivate objects.
+
+Every TurboActivate object using the same handle (same library, dat file,
+and version GUID) shares one HandleState:
+
+* The calls that change the license (activating, deactivating, saving a
+  product key, starting or extending a trial) hold HandleState.lock, so
+  they run one at a time.
+
+* The cached license state is an immutable LicenseState. Changing it means
+  building a new LicenseState and swapping the reference, so reading it is
+  a single attribute lookup that never blocks, even while a license change
+  is in progress.
+
+* Concurrent identical calls that go to the LimeLM servers (is_genuine(),
+  is_genuine_ex() with the same options, and activate() with the same
+  extra data) are coalesced by HandleState.flights: one thread makes the
+  native call and the others wait for its result.
+
+Everything else (the native library itself is thread safe) can be called
+from any number of threads at once.
+"""
+
+import threading
+import weakref
+from types import MappingProxyType
+
+from turboactivate.cache import ExpiryCache
+from turboactivate.singleflight import SingleFlight
+
+
+class LicenseState(object):
+
+    """
+    An immutable snapshot of the cached license state of a handle.
+
+    generation - increases every time the cached state is thrown away
+    features   - read-only mapping of the feature values looked up so far
+    """
+
+    __slots__ = ("generation", "features")
+
+    def __init__(self, generation, features):
+        self.generation = generation
+
+        # only a read-only view is published, so no reader can change the
+        # values every other object of the handle sees
+        self.features = MappingProxyType(features)
+
+
+class HandleState(object):
+
+    """The state shared by all the TurboActivate objects using one handle."""
+
+    def __init__(self):
+        # serializes the calls that change the license
+        self.lock = threading.RLock()
+
+        # the current LicenseState, only ever replaced as a whole
+        self.state = LicenseState(0, {})
+
+        # serializes the (short) updates of self.state
+        self._update_lock = threading.Lock()
+
+        # the result caches of the TurboActivate objects using this handle
+        self._caches = weakref.WeakSet()
+
+        # is_date_valid() and trial_days_remaining() answers, cleared with
+        # the rest of the state and by every trial event
+        self.expiry = ExpiryCache()
+
+        # coalesces the concurrent network bound calls
+        self.flights = SingleFlight()
+
+        # the handle's TrialEvents, created by the first TurboActivate object
+        # that needs it
+        self.trial_events = None
+
+        # whether the latest genuine check found the product genuine (None
+        # before the first one)
+        self._genuine = None
+
+    def _after_fork(self):
+        # Locks held by threads of the parent would never be released in the
+        # child. The cached state is kept: it's still true in the child.
+        self.lock = threading.RLock()
+        self._update_lock = threading.Lock()
+        self.flights._after_fork()
+        self.expiry._after_fork()
+
+        for cache in list(self._caches):
+            cache._after_fork()
+
+        if self.trial_events is not None:
+            self.trial_events._after_fork()
+
+    def add_cache(self, cache):
+        """Clears cache (a ResultCache) every time the license state is invalidated."""
+        self._caches.add(cache)
+
+    def cache_feature(self, generation, name, value):
+        """
+        Adds a feature value looked up while "generation" was current. The
+        value is dropped if the state was invalidated in the meantime.
+        """
+        with self._update_lock:
+            state = self.state
+
+            if state.generation == generation:
+                features = dict(state.features)
+                features[name] = value
+
+                self.state = LicenseState(generation, features)
+
+    def clear_features(self):
+        """Drops the cached feature values."""
+        with self._update_lock:
+            self.state = LicenseState(self.state.generation + 1, {})
+
+    def genuine_checked(self, genuine, key=None, result=None):
+        """
+        Records the outcome of a genuine check. TurboActivate deactivates the
+        product when it isn't genuine, so finding it not genuine (or genuine
+        again afterwards) drops the cached license state. Repeating the last
+        outcome doesn't, so the result caches keep working.
+
+        The check's own result is kept in the result caches under key, so
+        the next check doesn't call TurboActivate again.
+        """
+        with self._update_lock:
+            previous, self._genuine = self._genuine, genuine
+
+        if previous is not genuine and (not genuine or previous is False):
+            self.invalidate(key, result)
+
+    def invalidate(self, key=None, result=None):
+        """
+        Drops all the cached license state. With a key, the result caches
+        start over with result for it (see ResultCache.invalidate()).
+        """
+        self.clear_features()
+        self.expiry.invalidate()
+
+        for cache in list(self._caches):
+            cache.invalidate(key, result)
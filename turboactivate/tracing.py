@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+#
+# Copyright 2021 wyDay, LLC (https://wyday.com/)
+#
+#   Author: wyDay, LLC <support@wyday.com>
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+# FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS
+# IN THE SOFTWARE.
+
+"""
+Traces of the individual native TurboActivate calls: which TA_* function
+ran, on which thread, when, for how long, and what it returned.
+
+    from turboactivate.tracing import ChromeTraceWriter, Tracer
+
+    tracer = Tracer([ChromeTraceWriter("turboactivate.json")], sample_rate=0.01)
+    tracer.enable()
+    ...
+    tracer.disable()
+    tracer.close()      # writes the file
+
+Open the file in chrome://tracing or https://ui.perfetto.dev. For a quick
+capture of the calls of one TurboActivate object:
+
+    with ta.trace("activate.json"):
+        ta.activate()
+
+OpenTelemetrySpans sends each call as a span (with the GUID, the function
+name, and the return code as attributes) when the opentelemetry-api
+package is installed. A sink is any callable taking a TraceEvent.
+
+Like the metrics, tracing uses turboactivate.hooks, so the native calls
+aren't wrapped at all while no tracer (or other observer) is enabled.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from collections import namedtuple
+
+from turboactivate import hooks
+from turboactivate.metrics import RETURN_CODE_NAMES
+from turboactivate.registry import registry
+
+
+# The functions whose first argument isn't a handle
+_NO_HANDLE = frozenset((
+    "TA_GetHandle",
+    "TA_GetVersion",
+    "TA_PDetsFromByteArray",
+    "TA_PDetsFromPath",
+    "TA_SetCustomActDataPath",
+    "TA_SetCustomProxy",
+))
+
+
+class TraceEvent(namedtuple("TraceEvent", "name guid thread_id thread_name start duration return_code")):
+
+    """
+    One native call:
+
+    name        - the TA_* function
+    guid        - the version GUID of the handle it was called with (None if
+                  the function doesn't take one, or the GUID isn't known)
+    thread_id   - threading.get_ident() of the calling thread
+    thread_name - the name of the calling thread
+    start       - time.perf_counter() when the call started
+    duration    - how long the call took, in seconds
+    return_code - the TA_* return code (TA_OK for functions without one)
+    """
+
+    __slots__ = ()
+
+    @property
+    def return_code_name(self):
+        """The name of the return code, e.g. "TA_E_INET"."""
+        return RETURN_CODE_NAMES.get(self.return_code, str(self.return_code))
+
+
+class Tracer(object):
+
+    def __init__(self, sinks, sample_rate=1.0, handle=None):
+        """
+        Sends a TraceEvent for the sampled native calls to each sink.
+        sample_rate is the fraction of calls traced (it can be changed at
+        any time). With a handle only the calls on that handle (and the
+        calls that don't take one) are traced.
+        """
+        self.sinks = list(sinks)
+        self.sample_rate = sample_rate
+        self.handle = handle
+
+        self._random = random.Random()
+
+    def enable(self):
+        """Starts tracing every native TurboActivate call."""
+        hooks.add_observer(self)
+
+    def disable(self):
+        """Stops tracing."""
+        hooks.remove_observer(self)
+
+    def close(self):
+        """Stops tracing and closes the sinks that can be closed."""
+        self.disable()
+
+        for sink in self.sinks:
+            close = getattr(sink, "close", None)
+
+            if close is not None:
+                close()
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def _after_fork(self):
+        # don't sample the same calls as the parent and every other child
+        self._random.seed()
+
+        for sink in self.sinks:
+            after_fork = getattr(sink, "_after_fork", None)
+
+            if after_fork is not None:
+                after_fork()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __call__(self, name, args, start, duration, return_code):
+        if self.sample_rate < 1 and self._random.random() >= self.sample_rate:
+            return
+
+        guid = None
+
+        if name not in _NO_HANDLE and args:
+            if self.handle is not None and args[0] != self.handle:
+                return
+
+            guid = registry.guid_of(args[0])
+
+        thread = threading.current_thread()
+        event = TraceEvent(name, guid, thread.ident, thread.name, start, duration, return_code)
+
+        for sink in self.sinks:
+            sink(event)
+
+
+class ChromeTraceWriter(object):
+    """
+    Writes the events to a JSON file in the Chrome trace event format when
+    closed. At most max_events events are kept; the ones after that are
+    counted in "dropped" and left out.
+    """
+
+    def __init__(self, path, max_events=1000000):
+        self.path = path
+        self.max_events = max_events
+        self.dropped = 0
+
+        self._lock = threading.Lock()
+        self._events = []
+        self._threads = {}
+
+    def __call__(self, event):
+        with self._lock:
+            if len(self._events) >= self.max_events:
+                self.dropped += 1
+                return
+
+            self._events.append(event)
+            self._threads[event.thread_id] = event.thread_name
+
+    def _after_fork(self):
+        # the parent's events are the parent's to write
+        self._lock = threading.Lock()
+        self._events = []
+        self._threads = {}
+
+    def close(self):
+        """Writes the file."""
+        with self._lock:
+            events, self._events = self._events, []
+            threads, self._threads = self._threads, {}
+
+        pid = os.getpid()
+
+        trace = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": thread_id,
+                  "args": {"name": thread_name}}
+                 for thread_id, thread_name in threads.items()]
+
+        for event in events:
+            args = {"return_code": event.return_code_name}
+
+            if event.guid is not None:
+                args["guid"] = event.guid
+
+            trace.append({"name": event.name,
+                          "cat": "turboactivate",
+                          "ph": "X",
+                          "ts": event.start * 1e6,
+                          "dur": event.duration * 1e6,
+                          "pid": pid,
+                          "tid": event.thread_id,
+                          "args": args})
+
+        with open(self.path, "w") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms"}, f)
+
+
+class OpenTelemetrySpans(object):
+    """
+    Records each event as an OpenTelemetry span, a child of the span that's
+    current in the calling thread. Needs the opentelemetry-api package.
+    """
+
+    def __init__(self, tracer=None):
+        from opentelemetry import trace
+
+        self._tracer = tracer or trace.get_tracer("turboactivate")
+
+        # perf_counter() -> time.time() in nanoseconds
+        self._offset = int((time.time() - time.perf_counter()) * 1e9)
+
+    def __call__(self, event):
+        start = self._offset + int(event.start * 1e9)
+        attributes = {"turboactivate.function": event.name,
+                      "turboactivate.return_code": event.return_code,
+                      "turboactivate.return_code_name": event.return_code_name}
+
+        if event.guid is not None:
+            attributes["turboactivate.guid"] = event.guid
+
+        span = self._tracer.start_span(event.name, start_time=start, attributes=attributes)
+        span.end(end_time=start + int(event.duration * 1e9))